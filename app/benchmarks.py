@@ -0,0 +1,194 @@
+"""
+Benchmark CLI commands for the Budget App.
+
+Kept out of main.py so that app workers never import them. Run from app/:
+
+    flask --app benchmarks bench-json
+    flask --app benchmarks bench-partitions --rows 10000000
+    flask --app benchmarks bench-workers
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import click
+import requests
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    from main import add_months, app, db, ensure_month_partitions, from_cents, orjson
+except ModuleNotFoundError:  # `flask --app benchmarks` imports this file as app.benchmarks
+    from .main import add_months, app, db, ensure_month_partitions, from_cents, orjson
+
+
+@app.cli.command("bench-json")
+@click.option("--rows", default=10000, help="Number of listing rows to serialize.")
+@click.option("--repeat", default=20, help="Timed runs per provider.")
+def bench_json_command(rows, repeat):
+    """Compare stdlib and fast JSON providers on a transaction listing payload."""
+    now = datetime.utcnow()
+    payload = {
+        "transactions": [
+            {
+                "id": i,
+                "date": (now - timedelta(hours=i)).isoformat(),
+                "description": f"Transaction {i}",
+                "amount": from_cents(i * 137 % 100000),
+                "type": ("income", "expense", "bill")[i % 3],
+                "category": f"Category {i % 12}"
+            }
+            for i in range(rows)
+        ],
+        "next_cursor": None
+    }
+    providers = {"stdlib": DefaultJSONProvider(app), "fast": app.json}
+    if orjson is None:
+        print("⚠️  orjson is not installed; 'fast' uses the stdlib fallback")
+    for name, provider in providers.items():
+        with app.app_context():
+            seconds = min(timeit.repeat(lambda: provider.response(payload), number=1, repeat=repeat))
+        print(f"{name:>6}: {seconds * 1000:.2f} ms for {rows} transactions")
+
+
+@app.cli.command("bench-partitions")
+@click.option("--rows", default=10_000_000, help="Synthetic transactions to generate.")
+@click.option("--months", default=60, help="Months of history the rows are spread over.")
+@click.option("--repeat", default=5, help="Timed runs per table.")
+@click.option("--keep", is_flag=True, help="Keep the benchmark tables afterwards.")
+def bench_partitions_command(rows, months, repeat, keep):
+    """Compare a month-bounded aggregate on a plain vs a month-partitioned table.
+
+    Builds bench_transactions_plain and bench_transactions_partitioned with
+    the same synthetic rows (PostgreSQL only) and times the summary-style
+    query for the latest month on each.
+    """
+    if db.engine.dialect.name != "postgresql":
+        print("❌ Partitioning requires PostgreSQL")
+        sys.exit(1)
+    plain, partitioned = "bench_transactions_plain", "bench_transactions_partitioned"
+    last = date.today().replace(day=1)
+    first = add_months(last, -(months - 1))
+    span_seconds = int((datetime.combine(add_months(last, 1), datetime.min.time())
+                        - datetime.combine(first, datetime.min.time())).total_seconds())
+    query = """
+        SELECT transaction_type, SUM(amount_cents) FROM {table}
+        WHERE family_id = :fam AND occurred_at >= :lower AND occurred_at < :upper
+        GROUP BY transaction_type
+    """
+    params = {"fam": 1, "lower": last, "upper": add_months(last, 1)}
+
+    with db.engine.connect() as conn:
+        try:
+            print(f"⏳ Generating {rows} rows over {months} months")
+            with conn.begin():
+                conn.execute(db.text(f"DROP TABLE IF EXISTS {plain}, {partitioned} CASCADE"))
+                conn.execute(db.text(f"""
+                    CREATE TABLE {plain} (
+                        id BIGINT NOT NULL, family_id INTEGER NOT NULL, amount_cents BIGINT NOT NULL,
+                        transaction_type VARCHAR(50) NOT NULL, occurred_at TIMESTAMP NOT NULL
+                    )
+                """))
+                conn.execute(db.text(
+                    f"CREATE TABLE {partitioned} (LIKE {plain}) PARTITION BY RANGE (occurred_at)"
+                ))
+                ensure_month_partitions(conn, partitioned, first, last)
+                conn.execute(db.text(f"""
+                    INSERT INTO {plain}
+                    SELECT g, g % 1000, (g * 137) % 100000, (ARRAY['income', 'expense', 'bill'])[g % 3 + 1],
+                           CAST(:first AS TIMESTAMP) + ((g * 7919) % :span) * INTERVAL '1 second'
+                    FROM generate_series(1, CAST(:rows AS BIGINT)) AS g
+                """), {"first": first, "span": span_seconds, "rows": rows})
+                conn.execute(db.text(f"INSERT INTO {partitioned} SELECT * FROM {plain}"))
+                for table in (plain, partitioned):
+                    conn.execute(db.text(f"CREATE INDEX ON {table} (family_id, occurred_at DESC)"))
+            conn.execute(db.text(f"ANALYZE {plain}"))
+            conn.execute(db.text(f"ANALYZE {partitioned}"))
+            conn.commit()
+
+            for table in (plain, partitioned):
+                sql = db.text(query.format(table=table))
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    conn.execute(sql, params).all()
+                    timings.append(time.perf_counter() - started)
+                plan = conn.execute(db.text("EXPLAIN " + query.format(table=table)), params).scalars().all()
+                scanned = sum(1 for line in plan
+                              if f"on {table}" in line and "Bitmap Index Scan" not in line)
+                print(f"{table:>32}: {min(timings) * 1000:8.2f} ms, {scanned} relation(s) scanned")
+            conn.rollback()
+        finally:
+            if not keep:
+                conn.execute(db.text(f"DROP TABLE IF EXISTS {plain}, {partitioned} CASCADE"))
+                conn.commit()
+
+
+@app.cli.command("bench-workers")
+@click.option("--worker-class", "worker_classes", multiple=True, default=("sync", "gthread", "gevent"),
+              show_default=True, help="Worker classes to compare (repeatable).")
+@click.option("--route", "routes", multiple=True,
+              default=("/api/health", "/api/budget/summary", "/api/budget/transactions"),
+              show_default=True, help="Routes to load (repeatable).")
+@click.option("--concurrency", default=16, help="Concurrent client threads.")
+@click.option("--requests", "total", default=2000, help="Requests per route.")
+@click.option("--port", default=5099, help="Local port for the benchmark server.")
+def bench_workers_command(worker_classes, routes, concurrency, total, port):
+    """Start gunicorn with each worker class and measure API throughput.
+
+    Uses gunicorn.conf.py with GUNICORN_WORKER_CLASS overridden, against the
+    configured database, logged in as the demo user. Each run gets its own
+    Prometheus multiprocess directory and metrics port, so a gunicorn already
+    serving on this host is not disturbed.
+    """
+
+    base = f"http://127.0.0.1:{port}"
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    for worker_class in worker_classes:
+        metrics_dir = tempfile.TemporaryDirectory(prefix="bench_workers_")
+        env = {**os.environ, "GUNICORN_WORKER_CLASS": worker_class,
+               "PROMETHEUS_MULTIPROC_DIR": metrics_dir.name, "METRICS_PORT": str(port + 1)}
+        server = subprocess.Popen(
+            ["gunicorn", "--config", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "main:app"],
+            cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        try:
+            login = requests.Session()
+            for _ in range(100):
+                try:
+                    login.get(f"{base}/demo", timeout=5)
+                    break
+                except requests.ConnectionError:
+                    if server.poll() is not None:
+                        break
+                    time.sleep(0.2)
+            if server.poll() is not None:
+                print(f"❌ {worker_class}: gunicorn exited ({server.stderr.read().decode().strip()[-200:]})")
+                continue
+
+            local = threading.local()
+
+            def fetch(url):
+                if not hasattr(local, "http"):
+                    local.http = requests.Session()
+                    local.http.cookies.update(login.cookies)
+                return local.http.get(url, timeout=30).status_code
+
+            for route in routes:
+                started = time.perf_counter()
+                with ThreadPoolExecutor(concurrency) as pool:
+                    statuses = list(pool.map(fetch, [base + route] * total))
+                elapsed = time.perf_counter() - started
+                errors = sum(status >= 400 for status in statuses)
+                print(f"{worker_class:>8} {route:<28} {total / elapsed:9.1f} req/s"
+                      + (f"  ({errors} errors)" if errors else ""))
+        finally:
+            server.terminate()
+            server.wait()
+            metrics_dir.cleanup()
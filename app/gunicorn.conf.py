@@ -0,0 +1,130 @@
+"""
+Gunicorn configuration for the Budget App.
+
+Loaded automatically by gunicorn from the working directory (/app in the image).
+Every setting can be overridden through the GUNICORN_* environment variables
+below; `flask --app benchmarks bench-workers` compares worker classes on the API.
+
+Prometheus runs in multiprocess mode: workers write their samples to
+PROMETHEUS_MULTIPROC_DIR and the master serves the merged metrics of all
+workers on METRICS_PORT.
+"""
+
+import math
+import os
+import shutil
+import subprocess
+import sys
+
+
+def env_flag(name, default):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+def available_cpus():
+    """CPUs this container may use: the cgroup quota if set, else the affinity mask."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:  # cgroup v2: "<quota> <period>" or "max <period>"
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
+
+
+# Run the one-time bootstrap (wait for DB, migrations, default categories)
+# once before workers fork, as `python migrations.py` in a child process so
+# the master only imports the app when preload_app asks for it. Kubernetes
+# runs it in the `migrate` init container instead and sets
+# BOOTSTRAP_ON_START=false.
+BOOTSTRAP_ON_START = env_flag("BOOTSTRAP_ON_START", "true")
+
+# Must be in the environment before prometheus_client is imported (by the
+# bootstrap, preload or the workers). Emptied once per master in on_starting.
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9200"))
+
+# gthread (default): each worker serves `threads` requests at once, so slow
+# outbound calls (Google OAuth) no longer block the whole pod.
+# gevent: cooperative greenlets; needs `pip install gevent psycogreen`.
+# sync: one request per worker, the gunicorn default.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS") or 2 * available_cpus() + 1)
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))  # gevent only
+
+# Behind nginx: keep upstream connections open between requests
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Recycle workers periodically (bounds slow leaks); jitter keeps them from
+# all restarting at the same moment
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+# Import the app once in the master and fork it (faster worker boot, shared
+# memory pages). Workers drop the inherited DB connections in post_fork.
+preload_app = env_flag("GUNICORN_PRELOAD", "false")
+
+
+def on_starting(server):
+    # Samples left by a previous run's workers would be summed in forever.
+    # Not done at config import: a reload (HUP) re-reads this file while the
+    # workers' sample files are live.
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+    if BOOTSTRAP_ON_START:
+        # Without the multiprocess dir: its samples would outlive the process
+        env = {k: v for k, v in os.environ.items() if k != "PROMETHEUS_MULTIPROC_DIR"}
+        bootstrap = subprocess.run([sys.executable, "migrations.py"],
+                                   cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+        if bootstrap.returncode:
+            sys.exit("Bootstrap failed (python migrations.py)")
+    if "main" in sys.modules:  # imported by preload_app
+        # The master serves no requests: drop its DB connections and the
+        # per-process samples the import left behind
+        from main import app, db
+        from prometheus_client import multiprocess
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def when_ready(server):
+    from prometheus_flask_exporter.multiprocess import GunicornPrometheusMetrics
+    GunicornPrometheusMetrics.start_http_server_when_ready(METRICS_PORT)
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges from the merged view
+    from prometheus_flask_exporter.multiprocess import GunicornPrometheusMetrics
+    GunicornPrometheusMetrics.mark_process_dead_on_child_exit(worker.pid)
+
+
+def post_fork(server, worker):
+    # Pooled connections opened in the master by preload_app must not be
+    # shared with the children. Without preload there is nothing to drop, and
+    # importing the app here would precede gevent's monkey-patching.
+    if "main" not in sys.modules:
+        return
+    from main import app, db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    if worker_class == "gevent":
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            worker.log.warning("psycogreen is not installed; DB calls will block the gevent loop")
+        else:
+            patch_psycopg()
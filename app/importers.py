@@ -0,0 +1,136 @@
+"""
+Streaming bank statement parsers (CSV and OFX).
+
+Both parsers read the uploaded file incrementally and yield
+(line_number, payload) pairs, where payload uses the same keys as the
+add_transaction JSON body (type, amount, date, description, categoryId).
+Validation and insertion are left to main.py.
+"""
+
+import codecs
+import csv
+import re
+from datetime import datetime
+
+DEFAULT_CSV_COLUMNS = {
+    "type": "type",
+    "amount": "amount",
+    "date": "date",
+    "description": "description",
+    "category": "category",
+}
+DEFAULT_CATEGORY = "Other"
+
+# OFX transaction types that are recurring payments rather than ad-hoc spending
+OFX_BILL_TYPES = {"DIRECTDEBIT", "REPEATPMT"}
+
+
+# Optional sign, currency symbol/code, comma-grouped thousands and decimals:
+# '₪1,234.50', '-12.5', 'USD 40'. Anything else ('1e3', '12,50', accounting
+# style '(5.00)') is rejected.
+AMOUNT_PATTERN = re.compile(
+    r"([-+]?)\s*[^\d\s.,+()-]*\s*([-+]?)(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?\s*[^\d\s.,+()-]*"
+)
+
+
+def normalize_amount(raw):
+    """Plain decimal string for a statement amount: '₪1,234.50' -> '1234.50'.
+
+    Raises ValueError for values that are not a plain decimal, rather than
+    guessing (stripping characters turned '1e3' into '13').
+    """
+    raw = (raw or "").strip()
+    if not raw:
+        return ""
+    match = AMOUNT_PATTERN.fullmatch(raw)
+    if not match or (match.group(1) and match.group(2)):
+        raise ValueError(f"Invalid amount: {raw}")
+    sign = "-" if "-" in (match.group(1), match.group(2)) else ""
+    return sign + match.group(3).replace(",", "") + (match.group(4) or "")
+
+
+def signed_type(amount):
+    """Infer the transaction type from a signed amount when none is given."""
+    return "expense" if amount.startswith("-") else "income"
+
+
+def iter_csv_rows(stream, columns=None, date_format="%Y-%m-%d", encoding="utf-8-sig"):
+    """Yield (line_number, payload) for each data row of a CSV byte stream.
+
+    `columns` maps payload fields to CSV header names; fields whose column is
+    missing fall back to sensible defaults (sign of the amount for the type,
+    DEFAULT_CATEGORY for the category). The default encoding drops the BOM
+    that Excel writes at the start of "CSV UTF-8" exports. Rows that cannot
+    be parsed yield a ValueError in place of the payload.
+    """
+    columns = {**DEFAULT_CSV_COLUMNS, **(columns or {})}
+    text = codecs.getreader(encoding)(stream, errors="replace")
+    reader = csv.DictReader(text)
+
+    for row in reader:
+        try:
+            amount = normalize_amount(row.get(columns["amount"]))
+        except ValueError as e:
+            yield reader.line_num, e
+            continue
+        transaction_type = (row.get(columns["type"]) or "").strip().lower() or signed_type(amount)
+
+        raw_date = (row.get(columns["date"]) or "").strip()
+        try:
+            date = datetime.strptime(raw_date, date_format).strftime("%Y-%m-%d") if raw_date else None
+        except ValueError:
+            date = raw_date  # left for validation to reject with a clear message
+
+        yield reader.line_num, {
+            "type": transaction_type,
+            "amount": amount.lstrip("-"),
+            "date": date,
+            "description": (row.get(columns["description"]) or "").strip(),
+            "categoryId": (row.get(columns["category"]) or "").strip() or DEFAULT_CATEGORY,
+        }
+
+
+OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.S | re.I)
+OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+def iter_ofx_transactions(stream, chunk_size=64 * 1024, encoding="latin-1"):
+    """Yield the raw <STMTTRN> blocks of an OFX byte stream, chunk by chunk."""
+    buffer = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk.decode(encoding, errors="replace")
+        last_end = 0
+        for match in OFX_TRANSACTION.finditer(buffer):
+            yield match.group(1)
+            last_end = match.end()
+        # Keep only an unfinished block (or a tail that may hold a split tag)
+        buffer = buffer[last_end:]
+        start = buffer.upper().rfind("<STMTTRN>")
+        buffer = buffer[start:] if start >= 0 else buffer[-len("<STMTTRN>"):]
+
+
+def iter_ofx_rows(stream, category=DEFAULT_CATEGORY):
+    """Yield (transaction_number, payload) for each OFX statement transaction.
+
+    As with CSV, a transaction that cannot be parsed yields a ValueError.
+    """
+    for number, block in enumerate(iter_ofx_transactions(stream), start=1):
+        fields = {tag.upper(): value.strip() for tag, value in OFX_FIELD.findall(block)}
+        try:
+            amount = normalize_amount(fields.get("TRNAMT"))
+        except ValueError as e:
+            yield number, e
+            continue
+        transaction_type = "bill" if fields.get("TRNTYPE", "").upper() in OFX_BILL_TYPES else signed_type(amount)
+        posted = fields.get("DTPOSTED", "")[:8]
+
+        yield number, {
+            "type": transaction_type,
+            "amount": amount.lstrip("-"),
+            "date": f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}" if len(posted) == 8 else None,
+            "description": fields.get("NAME") or fields.get("MEMO") or "",
+            "categoryId": category,
+        }
@@ -1,54 +1,260 @@
-from datetime import datetime, timedelta
+import time
+_import_started = time.perf_counter()
+
+from datetime import date, datetime, timedelta
+import base64
+import binascii
+from collections import OrderedDict
+import heapq
+import csv
+import threading
+import zlib
+import io
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
 import os
 import json
 
-from flask import Flask, jsonify, request, redirect, url_for, session, render_template_string
+from flask import (
+    Flask, Response, jsonify, request, redirect, url_for, session, render_template_string,
+    stream_with_context, g, has_app_context, has_request_context
+)
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import case, event, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
 from flask_jwt_extended import (
     JWTManager, create_access_token, jwt_required, get_jwt, get_jwt_identity
 )
 from functools import wraps
+import click
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.security import generate_password_hash, check_password_hash
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
-from google_auth_oauthlib.flow import Flow
-import requests
+from prometheus_client import Gauge, Histogram
 from prometheus_flask_exporter import PrometheusMetrics
+from prometheus_flask_exporter.multiprocess import GunicornPrometheusMetrics
+
+try:
+    import importers
+except ModuleNotFoundError:  # `flask --app main` imports this file as app.main
+    from . import importers
+
+try:
+    import orjson
+except ImportError:  # optional: FastJSONProvider falls back to the stdlib encoder
+    orjson = None
 
 # Allow HTTP for local development (OAuth2 normally requires HTTPS)
 os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
 # ------------------ App & Config ------------------
+def json_default(o):
+    """Serialize values the encoders don't handle natively."""
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return str(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson when installed, stdlib json otherwise.
+
+    Output matches Flask's default provider (sorted keys, compact unless
+    debugging) except that dates are ISO 8601 rather than HTTP dates.
+    """
+    default = staticmethod(json_default)
+
+    def _orjson_option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = self._orjson_option(indent=bool(kwargs.get("indent")))
+        return orjson.dumps(obj, default=json_default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=json_default, option=self._orjson_option(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
-# Initialize Prometheus metrics
-metrics = PrometheusMetrics(app)
+# Initialize Prometheus metrics. Under gunicorn, gunicorn.conf.py sets
+# PROMETHEUS_MULTIPROC_DIR: every worker writes its samples there and the
+# master serves the merged view on METRICS_PORT instead of /metrics here.
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    metrics = GunicornPrometheusMetrics(app)
+else:
+    metrics = PrometheusMetrics(app)
 # Automatically tracks:
 # - Request count
 # - Request duration
 # - Request size
 # - Response size
-# Metrics available at /metrics endpoint
+# Metrics available at /metrics endpoint (single process) or on METRICS_PORT
+
+# Startup report: how long the module import took and how long after import
+# began the first request was served
+startup_import_seconds = Gauge(
+    "app_startup_import_seconds", "Time spent importing the application module",
+    multiprocess_mode="livemax"
+)
+startup_first_request_seconds = Gauge(
+    "app_startup_first_request_seconds", "Time from module import to the first request",
+    multiprocess_mode="livemax"
+)
+
+# Connection pool metrics, fed by TimedQueuePool below. Gauge callbacks
+# cannot be collected across processes, so the pool pushes its statistics on
+# every checkout and return (summed over live workers in multiprocess mode).
+db_pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled DB connection",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+)
+POOL_GAUGES = [
+    (Gauge(name, doc, ["bind"], multiprocess_mode="livesum"), method)
+    for name, method, doc in [
+        ("db_pool_size", "size", "Configured number of persistent pool connections"),
+        ("db_pool_checked_out", "checkedout", "Pool connections currently in use"),
+        ("db_pool_checked_in", "checkedin", "Idle connections held by the pool"),
+        ("db_pool_overflow", "overflow", "Connections open beyond the pool size"),
+    ]
+]
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited, plus its gauges.
+
+    The wait includes opening a new connection when the pool grows.
+    """
+    bind = "primary"  # label on the gauges, set per engine after creation
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_seconds.observe(time.perf_counter() - started)
+            self.record_stats()
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self.record_stats()
+
+    def recreate(self):
+        pool = super().recreate()  # engine.dispose(), e.g. after fork
+        pool.bind = self.bind
+        return pool
+
+    def record_stats(self):
+        for gauge, method in POOL_GAUGES:
+            # overflow() counts up from -pool_size until the pool is full
+            gauge.labels(self.bind).set(max(getattr(self, method)(), 0))
+
+def env_flag(name, default):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
 
 # envs (set in .env / docker-compose)
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+psycopg2://app:app@db:5432/app")
+DATABASE_BACKEND = make_url(DATABASE_URL).get_backend_name()
+# Per-worker pool: at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections; size
+# it so workers x that stays under the server's max_connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", "true")
+# Optional streaming replica for read-only routes (see use_read_replica);
+# families that wrote within REPLICA_STICKY_SECONDS keep reading the primary
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "change_me")
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-me")
+# Per-family read cache (summary, categories); entries also expire after the TTL
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_FAMILIES = int(os.getenv("CACHE_MAX_FAMILIES", "1024"))
 
 app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+if DATABASE_BACKEND != "sqlite":  # SQLite keeps Flask-SQLAlchemy's own pool setup
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+if DATABASE_READ_URL:
+    app.config["SQLALCHEMY_BINDS"] = {"replica": DATABASE_READ_URL}
 app.config["JWT_SECRET_KEY"] = JWT_SECRET_KEY
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=12)
 app.config["SECRET_KEY"] = SECRET_KEY
 
+# Largest accepted amount: 10 billion in major units, far below BIGINT so
+# per-family sums cannot overflow either
+MAX_AMOUNT_CENTS = 10**12
+# Transaction listing page sizes (keyset pagination)
+TRANSACTIONS_PAGE_SIZE = 100
+TRANSACTIONS_MAX_PAGE_SIZE = 500
+# Transactions per delta sync page (/api/budget/changes)
+CHANGES_PAGE_SIZE = 1000
+# Upper bounds on rows and body size accepted by one bulk insert request
+BULK_MAX_ROWS = 10000
+BULK_MAX_BYTES = 16 * 2**20
+# Statement imports are written and committed in batches of this many rows
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_ERRORS = 100
+# Rows fetched per round-trip by the streaming export's server-side cursor
+EXPORT_FETCH_SIZE = 1000
+# PostgreSQL only: range-partition transactions by occurred_at month at
+# bootstrap, keeping partitions ready this many months ahead
+PARTITION_TRANSACTIONS = env_flag("PARTITION_TRANSACTIONS", "false")
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# Default age (in months) for `flask archive-transactions`
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", "24"))
+
 # Google OAuth Config
 GOOGLE_DISCOVERY_URL = "https://accounts.google.com/.well-known/openid_configuration"
 
-db = SQLAlchemy(app)
+class RoutingSession(FlaskSession):
+    """Session sending reads of replica-enabled requests to the read replica.
+
+    Everything else (writes, flushes, other requests, CLI and bootstrap
+    code) uses the primary.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and has_request_context() and g.get("read_replica")
+                and not self._flushing and not getattr(clause, "is_dml", False)):
+            return self._db.engines["replica"]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(app, session_options={"class_": RoutingSession})
 jwt = JWTManager(app)
 
+with app.app_context():
+    for _bind, _engine in db.engines.items():
+        if isinstance(_engine.pool, TimedQueuePool):
+            _engine.pool.bind = _bind or "primary"
+
 # Custom authentication decorator that handles both JWT and session
 def auth_required(f):
     @wraps(f)
@@ -97,6 +303,10 @@ class Family(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False, unique=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by every write to the family's ledger or categories; drives ETags
+    data_version = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    # Transactions before this moment were moved to transactions_archive
+    archived_before = db.Column(db.DateTime, nullable=True)
 
 class User(db.Model):
     __tablename__ = "users"
@@ -113,26 +323,305 @@ class User(db.Model):
 
 class Category(db.Model):
     __tablename__ = "categories"
+    __table_args__ = (
+        db.Index("ix_categories_family_name", "family_id", "name", unique=True),
+        db.Index("ix_categories_family_change", "family_id", "change_version"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     family_id = db.Column(db.Integer, db.ForeignKey("families.id"), nullable=False)
     name = db.Column(db.String(120), nullable=False)
-    monthly_budget = db.Column(db.Numeric(12, 2), default=0)
+    monthly_budget_cents = db.Column(db.BigInteger, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Family data_version of the write that created the row (delta sync cursor)
+    change_version = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
 
 class Transaction(db.Model):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Listing order and keyset pagination: newest first within a family
+        db.Index("ix_transactions_family_occurred", "family_id",
+                 db.text("occurred_at DESC"), db.text("id DESC")),
+        db.Index("ix_transactions_family_type", "family_id", "transaction_type"),
+        db.Index("ix_transactions_family_change", "family_id", "change_version"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     family_id = db.Column(db.Integer, db.ForeignKey("families.id"), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
-    amount = db.Column(db.Numeric(12, 2), nullable=False)
+    amount_cents = db.Column(db.BigInteger, nullable=False)  # minor units (agorot)
     transaction_type = db.Column(db.String(50), nullable=False)  # 'income', 'expense', 'bill'
     note = db.Column(db.String(255))
     occurred_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Family data_version of the write that created the row (delta sync cursor)
+    change_version = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
     
     # Relationship to Category
     category = db.relationship("Category", backref="transactions")
 
+class TransactionArchive(db.Model):
+    """Cold copy of old transactions, moved out by `flask archive-transactions`.
+
+    Same columns as transactions; read only when a request's date range
+    reaches back before the family's archived_before.
+    """
+    __tablename__ = "transactions_archive"
+    __table_args__ = (
+        db.Index("ix_archive_family_occurred", "family_id",
+                 db.text("occurred_at DESC"), db.text("id DESC")),
+        db.Index("ix_archive_family_change", "family_id", "change_version"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    family_id = db.Column(db.Integer, db.ForeignKey("families.id"), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
+    amount_cents = db.Column(db.BigInteger, nullable=False)
+    transaction_type = db.Column(db.String(50), nullable=False)
+    note = db.Column(db.String(255))
+    occurred_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime)
+    change_version = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+
+class TransactionTombstone(db.Model):
+    """Record of a deleted transaction, so delta sync clients can drop it too."""
+    __tablename__ = "transaction_tombstones"
+    __table_args__ = (
+        db.Index("ix_tombstones_family_change", "family_id", "change_version"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    family_id = db.Column(db.Integer, db.ForeignKey("families.id"), nullable=False)
+    transaction_id = db.Column(db.Integer, nullable=False)
+    change_version = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class FamilyMonthlyRollup(db.Model):
+    """Per-family, per-month running totals maintained alongside transactions."""
+    __tablename__ = "family_monthly_rollup"
+    __table_args__ = (
+        db.Index("uq_rollup_bucket", "family_id", "month", "category_id", "transaction_type",
+                 unique=True),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    family_id = db.Column(db.Integer, db.ForeignKey("families.id"), nullable=False)
+    month = db.Column(db.Date, nullable=False)  # first day of the month
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
+    transaction_type = db.Column(db.String(50), nullable=False)
+    total_cents = db.Column(db.BigInteger, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# ------------------ Read cache ------------------
+_MISSING = object()
+
+class FamilyCache:
+    """Bounded in-process cache of per-family read results.
+
+    Families are evicted least-recently-used beyond max_families, and each
+    entry expires after ttl seconds. Writes invalidate a whole family once
+    their DB transaction commits (see invalidate_committed_families).
+    """
+
+    def __init__(self, max_families, ttl):
+        self.max_families = max_families
+        self.ttl = ttl
+        self._families = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fam_id, key):
+        with self._lock:
+            entries = self._families.get(fam_id)
+            if entries is None:
+                return _MISSING
+            self._families.move_to_end(fam_id)
+            expires, value = entries.get(key, (0, _MISSING))
+            if expires < time.monotonic():
+                entries.pop(key, None)
+                return _MISSING
+            return value
+
+    def set(self, fam_id, key, value):
+        with self._lock:
+            entries = self._families.setdefault(fam_id, {})
+            self._families.move_to_end(fam_id)
+            entries[key] = (time.monotonic() + self.ttl, value)
+            while len(self._families) > self.max_families:
+                self._families.popitem(last=False)
+
+    def get_or_set(self, fam_id, key, compute):
+        value = self.get(fam_id, key)
+        if value is _MISSING:
+            value = compute()
+            self.set(fam_id, key, value)
+        return value
+
+    def invalidate(self, fam_id):
+        with self._lock:
+            self._families.pop(fam_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._families.clear()
+
+family_cache = FamilyCache(CACHE_MAX_FAMILIES, CACHE_TTL_SECONDS)
+# Category key (id or name) -> id for the write path (resolve_categories).
+# Categories are never renamed or deleted, so entries stay valid across
+# writes and are not invalidated by them; only committed categories go in.
+category_id_cache = FamilyCache(CACHE_MAX_FAMILIES, CACHE_TTL_SECONDS)
+
+class InvalidationBus:
+    """Delivers family_changed events to local subscribers after commit.
+
+    Used as-is for SQLite (dev/tests), where there is a single process.
+    PostgresInvalidationBus also fans events out to every other worker.
+    """
+
+    def __init__(self):
+        self._on_change = []
+        self._on_reset = []
+
+    def subscribe(self, on_change, on_reset=None):
+        self._on_change.append(on_change)
+        if on_reset:
+            self._on_reset.append(on_reset)
+
+    def publish(self, session, fam_id):
+        """Announce a change inside the writing transaction (no-op locally)."""
+
+    def publish_all(self, session):
+        """Announce that every family changed, e.g. after a full rollup rebuild."""
+
+    def deliver(self, fam_id):
+        for callback in self._on_change:
+            callback(fam_id)
+
+    def reset(self):
+        for callback in self._on_reset:
+            callback()
+
+    def start(self):
+        """Begin receiving events from other processes (no-op locally)."""
+
+class PostgresInvalidationBus(InvalidationBus):
+    """family_changed events over PostgreSQL LISTEN/NOTIFY.
+
+    publish() issues pg_notify in the writer's transaction, so the event is
+    sent only if that transaction commits. start() runs a daemon thread per
+    worker holding a dedicated LISTEN connection outside the pool.
+    """
+    CHANNEL = "family_changed"
+
+    def __init__(self):
+        super().__init__()
+        self._started = False
+        self._lock = threading.Lock()
+
+    ALL_FAMILIES = "*"
+
+    def publish(self, session, fam_id):
+        session.execute(db.text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": self.CHANNEL, "payload": str(fam_id)})
+
+    def publish_all(self, session):
+        self.publish(session, self.ALL_FAMILIES)
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        # Workers fork after import, so the thread is started lazily in each one
+        threading.Thread(target=self._listen, args=(db.engine,), daemon=True,
+                         name="family-changed-listener").start()
+
+    def _listen(self, engine):
+        import select
+        while True:
+            raw = None
+            try:
+                raw = engine.raw_connection()
+                raw.detach()  # keep the long-lived LISTEN connection out of the pool
+                conn = raw.dbapi_connection  # driver_connection is None once detached
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {self.CHANNEL}")
+                # Events may have been missed while disconnected
+                self.reset()
+                while True:
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        if notify.payload == self.ALL_FAMILIES:
+                            self.reset()
+                        else:
+                            self.deliver(int(notify.payload))
+            except Exception as e:
+                print(f"⚠️  Cache invalidation listener error: {e}; reconnecting")
+                time.sleep(2)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+
+if DATABASE_BACKEND == "postgresql":
+    invalidation_bus = PostgresInvalidationBus()
+else:
+    invalidation_bus = InvalidationBus()
+invalidation_bus.subscribe(family_cache.invalidate, on_reset=family_cache.clear)
+
+class RecentWrites:
+    """Families that committed a write within the last `window` seconds.
+
+    Fed by the invalidation bus, so a write in any worker makes the family
+    read from the primary everywhere until the replica has caught up.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._written = {}
+        self._all_until = 0.0
+
+    def record(self, fam_id):
+        self._written[fam_id] = time.monotonic() + self.window
+
+    def reset(self):
+        # Writes may have gone unseen (listener reconnect) or every family
+        # changed at once (full rollup rebuild): trust no one
+        self._all_until = time.monotonic() + self.window
+
+    def is_recent(self, fam_id):
+        now = time.monotonic()
+        if now < self._all_until:
+            return True
+        until = self._written.get(fam_id)
+        if until is None:
+            return False
+        if now >= until:
+            self._written.pop(fam_id, None)
+            return False
+        return True
+
+recent_writes = RecentWrites(REPLICA_STICKY_SECONDS)
+if DATABASE_READ_URL:
+    invalidation_bus.subscribe(recent_writes.record, on_reset=recent_writes.reset)
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed_families(session):
+    # Evict locally right away (read-your-writes in this process); other
+    # workers evict when the NOTIFY sent by publish() reaches them
+    for fam_id in session.info.pop("changed_families", ()):
+        invalidation_bus.deliver(fam_id)
+    forget_family_versions()
+
+@event.listens_for(Session, "after_rollback")
+def forget_rolled_back_families(session):
+    session.info.pop("changed_families", None)
+    forget_family_versions()
+
+def forget_family_versions():
+    # Reads after a commit/rollback (e.g. in CLI commands) see new versions
+    if has_app_context():
+        g.pop("family_versions", None)
+
 # ------------------ Helpers ------------------
 def create_default_family(name: str) -> Family:
     fam = Family(name=name)
@@ -153,6 +642,9 @@ def get_google_provider_cfg():
     }
 
 def create_oauth_flow():
+    # Imported on first use: the OAuth stack is heavy and only these routes need it
+    from google_auth_oauthlib.flow import Flow
+
     google_provider_cfg = get_google_provider_cfg()
     flow = Flow.from_client_config(
         {
@@ -170,6 +662,689 @@ def create_oauth_flow():
     flow.redirect_uri = "http://localhost:8888/auth/google/callback"
     return flow
 
+def to_cents(amount):
+    """Major-unit amount (str/int/float/Decimal) to integer minor units, half-up.
+
+    Raises ValueError for non-numbers, NaN/infinity and amounts beyond
+    MAX_AMOUNT_CENTS.
+    """
+    try:
+        amount = Decimal(str(amount).strip())
+    except InvalidOperation:
+        raise ValueError("Invalid amount")
+    if not amount.is_finite() or abs(amount) * 100 > MAX_AMOUNT_CENTS:
+        raise ValueError("Invalid amount")
+    cents = (amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    return int(cents)
+
+def from_cents(cents):
+    """Integer minor units to a JSON number in major units (formatting edge only)."""
+    return cents / 100
+
+def format_cents(cents):
+    """Integer minor units as an exact decimal string: -1250 -> '-12.50'."""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+def bump_family_version(fam_id):
+    """Mark the family's data as changed, in the caller's DB transaction.
+
+    Returns the new data_version, which writers stamp on the rows they create
+    (change_version). The bump happens once per DB transaction; later calls
+    return the same version. Call it before writing rows: the UPDATE locks the
+    family row until commit, so versions become visible in increasing order.
+
+    Cached reads for the family are dropped once the transaction commits, in
+    this process and (via the invalidation bus) in every other worker.
+    """
+    changed = db.session.info.setdefault("changed_families", {})
+    if fam_id not in changed:
+        invalidation_bus.publish(db.session, fam_id)
+        changed[fam_id] = db.session.execute(
+            db.update(Family).where(Family.id == fam_id)
+            .values(data_version=Family.data_version + 1)
+            .returning(Family.data_version)
+        ).scalar_one()
+    return changed[fam_id]
+
+def bump_all_family_versions():
+    """bump_family_version for every family at once: one UPDATE, one event."""
+    changed = db.session.info.setdefault("changed_families", {})
+    invalidation_bus.publish_all(db.session)
+    changed.update(db.session.execute(
+        db.update(Family).values(data_version=Family.data_version + 1)
+        .returning(Family.id, Family.data_version)
+    ).all())
+
+def family_data_version(fam_id):
+    """The family's data_version, read once per request (memoized on g).
+
+    The ETag and the cache keys of a request both come from this value, so a
+    response never pairs a newer ETag with data cached for an older version.
+    """
+    versions = g.setdefault("family_versions", {})
+    if fam_id not in versions:
+        versions[fam_id] = db.session.query(Family.data_version).filter_by(id=fam_id).scalar()
+    return versions[fam_id]
+
+def cached_family_read(fam_id, key, compute):
+    """family_cache.get_or_set keyed by the request's family data_version.
+
+    Inside a write (after bump_family_version) the cache is bypassed: the
+    transaction's own uncommitted rows must never be cached.
+    """
+    if fam_id in db.session.info.get("changed_families", ()):
+        return compute()
+    return family_cache.get_or_set(fam_id, (key, family_data_version(fam_id)), compute)
+
+def family_etag(fam_id):
+    """Strong ETag for a family-scoped GET: data version + today + exact URL.
+
+    The date component expires month-relative results (e.g. the summary's
+    current-month breakdown) without any write happening.
+    """
+    version = family_data_version(fam_id)
+    url_hash = zlib.crc32(request.full_path.encode())
+    return f"{fam_id}.{version}.{date.today().isoformat()}.{url_hash:08x}"
+
+def use_read_replica(f):
+    """Serve a read-only route from DATABASE_READ_URL when one is configured.
+
+    Families that wrote in the last REPLICA_STICKY_SECONDS read from the
+    primary instead, so a client always sees its own writes.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if DATABASE_READ_URL and not recent_writes.is_recent(get_current_family_id()):
+            g.read_replica = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+def conditional_on_family_version(f):
+    """Answer 304 when If-None-Match matches, skipping the query and serialization."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        etag = family_etag(get_current_family_id())
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    return decorated_function
+
+TIMESERIES_GRANULARITIES = ("day", "week", "month")
+
+def period_start(column, granularity):
+    """SQL DATE expression truncating a timestamp column to its day/week/month.
+
+    Weeks start on Monday, as with PostgreSQL's date_trunc('week').
+    """
+    if db.engine.dialect.name == "sqlite":
+        modifiers = {"day": (), "week": ("weekday 0", "-6 days"), "month": ("start of month",)}
+        return func.date(column, *modifiers[granularity], type_=db.Date)
+    return db.cast(func.date_trunc(granularity, column), db.Date)
+
+def month_start(column):
+    """SQL DATE expression for the first day of a timestamp column's month."""
+    return period_start(column, "month")
+
+def dialect_insert(table):
+    """INSERT construct supporting ON CONFLICT for the active database."""
+    if db.engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(table)
+
+def rollup_delta(family_id, occurred_at, category_id, transaction_type, amount_cents, sign=1):
+    """Rollup bucket key plus the (total, count) change for one transaction."""
+    return {
+        "family_id": family_id,
+        "month": occurred_at.date().replace(day=1),
+        "category_id": category_id,
+        "transaction_type": transaction_type,
+        "total_cents": amount_cents * sign,
+        "count": sign
+    }
+
+def apply_rollup_deltas(deltas):
+    """Upsert (total, count) changes into their rollup buckets.
+
+    Runs in the caller's DB transaction, so the rollup commits or rolls back
+    together with the transaction rows themselves.
+    """
+    if not deltas:
+        return
+    rollup = FamilyMonthlyRollup.__table__
+    stmt = dialect_insert(rollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["family_id", "month", "category_id", "transaction_type"],
+        set_={
+            "total_cents": rollup.c.total_cents + stmt.excluded.total_cents,
+            "count": rollup.c.count + stmt.excluded.count
+        }
+    )
+    db.session.execute(stmt, deltas)
+    if any(d["count"] < 0 for d in deltas):
+        db.session.execute(rollup.delete().where(
+            rollup.c.family_id.in_({d["family_id"] for d in deltas}),
+            rollup.c.count <= 0
+        ))
+
+def update_rollup(transaction, sign=1):
+    """Apply a transaction to its rollup bucket (sign=-1 to remove it)."""
+    apply_rollup_deltas([rollup_delta(
+        transaction.family_id,
+        transaction.occurred_at,
+        transaction.category_id,
+        transaction.transaction_type,
+        transaction.amount_cents,
+        sign
+    )])
+
+def rollup_rebuild_statements(fam_id=None, models=None):
+    """DELETE + INSERT ... SELECT pair recomputing rollup rows from transactions.
+
+    `models` are the tables summed (hot and archived transactions by default).
+    """
+    rollup = FamilyMonthlyRollup.__table__
+    ledger = db.union_all(*[
+        db.select(model.family_id, model.occurred_at, model.category_id,
+                  model.transaction_type, model.amount_cents, model.id).where(
+            db.true() if fam_id is None else model.family_id == fam_id
+        )
+        for model in models or (Transaction, TransactionArchive)
+    ]).subquery()
+    month = month_start(ledger.c.occurred_at)
+
+    source = db.select(
+        ledger.c.family_id,
+        month,
+        ledger.c.category_id,
+        ledger.c.transaction_type,
+        func.sum(ledger.c.amount_cents),
+        func.count(ledger.c.id)
+    ).group_by(
+        ledger.c.family_id, month, ledger.c.category_id, ledger.c.transaction_type
+    )
+    delete = rollup.delete()
+    if fam_id is not None:
+        delete = delete.where(rollup.c.family_id == fam_id)
+
+    insert = rollup.insert().from_select(
+        ["family_id", "month", "category_id", "transaction_type", "total_cents", "count"],
+        source
+    )
+    return delete, insert
+
+def rebuild_rollup(fam_id=None):
+    """Recompute rollup rows from transactions (all families or just one).
+
+    The affected families' data versions are bumped in the same transaction,
+    so cached summaries and ETags move on in every worker.
+    """
+    if fam_id is None:
+        bump_all_family_versions()
+    else:
+        bump_family_version(fam_id)
+    for stmt in rollup_rebuild_statements(fam_id):
+        db.session.execute(stmt)
+    db.session.commit()
+
+def budget_summary_query(fam_id):
+    """Per-category type totals and current-month total from the rollup."""
+    current_month = date.today().replace(day=1)
+
+    def type_total(transaction_type):
+        return func.sum(case(
+            (FamilyMonthlyRollup.transaction_type == transaction_type, FamilyMonthlyRollup.total_cents),
+            else_=0
+        ))
+
+    month_total = func.sum(case(
+        (FamilyMonthlyRollup.month >= current_month, FamilyMonthlyRollup.total_cents)
+    ))
+
+    return db.session.query(
+        Category.name,
+        type_total('income'),
+        type_total('expense'),
+        type_total('bill'),
+        month_total
+    ).join(FamilyMonthlyRollup, FamilyMonthlyRollup.category_id == Category.id).filter(
+        FamilyMonthlyRollup.family_id == fam_id
+    ).group_by(Category.name)
+
+def compute_budget_summary(fam_id):
+    """Compute type totals and this month's category breakdown from the rollup.
+
+    Reads FamilyMonthlyRollup, so the cost grows with categories x months
+    rather than with the number of transactions.
+    """
+    rows = budget_summary_query(fam_id).all()
+
+    # Exact integer arithmetic in cents (PostgreSQL SUM(bigint) returns numeric)
+    income = expenses = bills = 0
+    month_totals = []
+    for cat_name, cat_income, cat_expenses, cat_bills, cat_month in rows:
+        income += int(cat_income or 0)
+        expenses += int(cat_expenses or 0)
+        bills += int(cat_bills or 0)
+        if cat_month is not None:
+            month_totals.append((cat_name, int(cat_month)))
+
+    month_totals.sort(key=lambda c: c[1], reverse=True)
+
+    return {
+        "balance": from_cents(income - expenses - bills),
+        "income": from_cents(income),
+        "expenses": from_cents(expenses),
+        "bills": from_cents(bills),
+        "categories": [{"name": name, "amount": from_cents(total)} for name, total in month_totals]
+    }
+
+def compute_budget_variance(fam_id, month):
+    """Budget vs. spending (expenses + bills) per category for one month.
+
+    A single query: every category of the family, left-joined to that
+    month's rollup buckets summed per category.
+    """
+    spent = db.session.query(
+        FamilyMonthlyRollup.category_id,
+        func.sum(FamilyMonthlyRollup.total_cents).label("actual_cents")
+    ).filter(
+        FamilyMonthlyRollup.family_id == fam_id,
+        FamilyMonthlyRollup.month == month,
+        FamilyMonthlyRollup.transaction_type.in_(("expense", "bill"))
+    ).group_by(FamilyMonthlyRollup.category_id).subquery()
+
+    rows = db.session.query(
+        Category.id, Category.name, Category.monthly_budget_cents, spent.c.actual_cents
+    ).outerjoin(spent, spent.c.category_id == Category.id).filter(
+        Category.family_id == fam_id
+    ).order_by(Category.name)
+
+    categories = []
+    total_budget = total_actual = 0
+    for cat_id, name, budget_cents, actual_cents in rows:
+        budget_cents, actual_cents = budget_cents or 0, int(actual_cents or 0)
+        total_budget += budget_cents
+        total_actual += actual_cents
+        categories.append({
+            "id": cat_id,
+            "name": name,
+            "budget": from_cents(budget_cents),
+            "actual": from_cents(actual_cents),
+            "remaining": from_cents(budget_cents - actual_cents),
+            # No percentage for unbudgeted categories
+            "percent": round(actual_cents * 100 / budget_cents, 1) if budget_cents else None,
+            "over_budget": actual_cents > budget_cents
+        })
+
+    return {
+        "month": month.strftime("%Y-%m"),
+        "budget": from_cents(total_budget),
+        "actual": from_cents(total_actual),
+        "remaining": from_cents(total_budget - total_actual),
+        "categories": categories
+    }
+
+def archive_cutoff(fam_id):
+    """The family's archived_before (None if nothing was archived), cached."""
+    return cached_family_read(
+        fam_id, "archived_before",
+        lambda: db.session.query(Family.archived_before).filter_by(id=fam_id).scalar()
+    )
+
+def ledger_models(fam_id, date_from=None):
+    """Tables holding the family's transactions on or after date_from.
+
+    The archive is only included when the range reaches back before the
+    family's archive cutoff, so recent-month requests never touch it.
+    """
+    cutoff = archive_cutoff(fam_id)
+    if cutoff is not None and (date_from is None or date_from < cutoff):
+        return (Transaction, TransactionArchive)
+    return (Transaction,)
+
+def ledger_query(model, fam_id, date_from=None, date_to=None, transaction_type=None,
+                 category=None, cursor=None):
+    """Filtered (id, ..., category_name) rows of one ledger table, unordered."""
+    # Project plain columns joined to the category name: one statement, no
+    # ORM hydration and no per-row lazy load of Transaction.category
+    query = db.session.query(
+        model.id.label("id"),
+        model.occurred_at.label("occurred_at"),
+        model.note.label("note"),
+        model.amount_cents.label("amount_cents"),
+        model.transaction_type.label("transaction_type"),
+        Category.name.label("category_name")
+    ).outerjoin(Category, Category.id == model.category_id)
+    query = filter_transactions(query, fam_id, date_from, date_to, transaction_type, category,
+                                model=model)
+    # Keyset pagination: continue strictly after the last (occurred_at, id) seen.
+    # The redundant plain bound lets a partitioned table skip newer months.
+    if cursor:
+        query = query.filter(model.occurred_at <= cursor[0],
+                             db.tuple_(model.occurred_at, model.id) < cursor)
+    return query
+
+def transactions_query(fam_id, date_from=None, date_to=None, transaction_type=None,
+                       category=None, cursor=None):
+    """Filtered transaction listing, newest first, as (id, ..., category_name) rows.
+
+    Archived transactions are unioned in only when the date range reaches them.
+    """
+    queries = [
+        ledger_query(model, fam_id, date_from, date_to, transaction_type, category, cursor)
+        for model in ledger_models(fam_id, date_from)
+    ]
+    if len(queries) == 1:
+        return queries[0].order_by(Transaction.occurred_at.desc(), Transaction.id.desc())
+    ledger = queries[0].union_all(*queries[1:]).subquery()
+    return db.session.query(ledger).order_by(ledger.c.occurred_at.desc(), ledger.c.id.desc())
+
+def filter_transactions(query, fam_id, date_from=None, date_to=None, transaction_type=None,
+                        category=None, model=Transaction):
+    """Apply the family scope and the from/to/type/category filters to a query."""
+    query = query.filter(model.family_id == fam_id)
+    if date_from:
+        query = query.filter(model.occurred_at >= date_from)
+    if date_to:
+        # "to" is inclusive of the whole day
+        query = query.filter(model.occurred_at < date_to + timedelta(days=1))
+    if transaction_type:
+        query = query.filter(model.transaction_type == transaction_type)
+    if category:
+        if category.isdigit():
+            query = query.filter(model.category_id == int(category))
+        else:
+            query = query.filter(model.category_id.in_(
+                db.select(Category.id).where(Category.family_id == fam_id, Category.name == category)
+            ))
+    return query
+
+def compute_timeseries(fam_id, granularity, **filters):
+    """Per-period income/expense/bill totals and expense+bill totals per category.
+
+    Both are GROUP BY queries over the filtered transactions, so the response
+    has one point per period instead of one row per transaction.
+    """
+    series = {}
+    spent = {}
+    # Sums are additive, so hot and archived transactions are aggregated
+    # separately and merged
+    for model in ledger_models(fam_id, filters.get("date_from")):
+        period = period_start(model.occurred_at, granularity).label("period")
+        rows = filter_transactions(
+            db.session.query(period, model.transaction_type, func.sum(model.amount_cents)),
+            fam_id, model=model, **filters
+        ).group_by(period, model.transaction_type)
+        for period_date, transaction_type, total in rows:
+            point = series.setdefault(period_date, {"income": 0, "expense": 0, "bill": 0})
+            point[transaction_type] = point.get(transaction_type, 0) + int(total or 0)
+
+        by_category = filter_transactions(
+            db.session.query(Category.name, func.sum(model.amount_cents))
+            .join(Category, Category.id == model.category_id)
+            .filter(model.transaction_type.in_(("expense", "bill"))),
+            fam_id, model=model, **filters
+        ).group_by(Category.name)
+        for name, total in by_category:
+            spent[name] = spent.get(name, 0) + int(total or 0)
+    categories = sorted(spent.items(), key=lambda c: c[1], reverse=True)
+
+    return {
+        "granularity": granularity,
+        "series": [
+            {"period": period_date.isoformat(),
+             **{key: from_cents(cents) for key, cents in point.items()}}
+            for period_date, point in sorted(series.items())
+        ],
+        "categories": [{"name": name, "amount": from_cents(total)} for name, total in categories]
+    }
+
+def transaction_json(t):
+    """API representation of a transactions_query row."""
+    return {
+        "id": t.id,
+        "date": t.occurred_at.isoformat(),
+        "description": t.note or "No description",
+        "amount": from_cents(t.amount_cents),
+        "type": t.transaction_type,
+        "category": t.category_name or "Unknown"
+    }
+
+def parse_transaction_payload(data, require_date=False):
+    """Validate one transaction payload; raises ValueError with a client message.
+
+    Without a date the transaction is dated now, unless require_date is set
+    (statement imports, where a missing date means a wrong column mapping).
+    """
+    transaction_type = data.get("type")
+    amount = data.get("amount")
+    transaction_date = data.get("date")
+    category_id = data.get("categoryId")
+
+    if not transaction_type or not amount or not category_id:
+        raise ValueError("Type, amount, and category are required")
+
+    if transaction_type not in ['income', 'expense', 'bill']:
+        raise ValueError("Invalid transaction type")
+
+    amount_cents = to_cents(amount)
+
+    # Check column limits here, so one oversized row is reported on its own
+    # instead of failing a whole bulk insert
+    description = data.get("description") or ""
+    if not isinstance(description, str):
+        raise ValueError("Description must be a string")
+    if len(description) > Transaction.note.type.length:
+        raise ValueError(f"Description is longer than {Transaction.note.type.length} characters")
+    if isinstance(category_id, bool) or not isinstance(category_id, (str, int)):
+        raise ValueError("Category must be a category id or name")
+    category = str(category_id).strip()
+    if not category:
+        raise ValueError("Type, amount, and category are required")
+    if len(category) > Category.name.type.length:
+        raise ValueError(f"Category is longer than {Category.name.type.length} characters")
+
+    # Parse the date
+    if require_date and not transaction_date:
+        raise ValueError("Date is required")
+    occurred_at = datetime.utcnow()  # Default to now
+    if transaction_date:
+        try:
+            occurred_at = datetime.strptime(transaction_date, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            raise ValueError("Invalid date format. Use YYYY-MM-DD")
+
+    return {
+        "type": transaction_type,
+        "amount_cents": amount_cents,
+        "description": description,
+        "occurred_at": occurred_at,
+        "category": category
+    }
+
+def family_categories(fam_id):
+    """The family's categories ordered by name, as plain dicts (cached)."""
+    def load():
+        rows = db.session.query(
+            Category.id, Category.name, Category.monthly_budget_cents
+        ).filter_by(family_id=fam_id).order_by(Category.name).all()
+        return [
+            {"id": c.id, "name": c.name, "monthly_budget_cents": c.monthly_budget_cents or 0}
+            for c in rows
+        ]
+    return cached_family_read(fam_id, "categories", load)
+
+def resolve_categories(fam_id, keys):
+    """Map category keys (ids or names, as in add_transaction) to category ids.
+
+    Keys are looked up in category_id_cache first, then the family's data
+    version is bumped (taking the family lock). Only the misses are fetched,
+    in one query under the lock, and unknown keys become new categories named
+    after the key, inserted in one flush. The caller commits.
+    """
+    def lookup(categories):
+        by_id = {str(c.id): c.id for c in categories}
+        by_name = {c.name: c.id for c in categories}
+        return {
+            key: (by_id.get(key) if key.isdigit() else None) or by_name.get(key)
+            for key in keys
+        }
+
+    resolved = {}
+    for key in keys:
+        category_id = category_id_cache.get(fam_id, key)
+        if category_id is not _MISSING:
+            resolved[key] = category_id
+    version = bump_family_version(fam_id)
+    missing = set(keys) - set(resolved)
+    if not missing:
+        return resolved
+
+    # Not cached yet (or created by another process since): ask the database
+    ids = {int(k) for k in missing if k.isdigit()}
+    existing = Category.query.filter(
+        Category.family_id == fam_id,
+        db.or_(Category.id.in_(ids), Category.name.in_(missing))
+    ).all()
+    found = lookup(existing)
+    # Rows stamped with this transaction's version are not committed yet
+    committed = {c.id for c in existing if c.change_version != version}
+
+    created = {}
+    for key in missing:
+        if found.get(key):
+            resolved[key] = found[key]
+            if found[key] in committed:
+                category_id_cache.set(fam_id, key, found[key])
+        else:
+            created[key] = Category(family_id=fam_id, name=key, monthly_budget_cents=0,
+                                    change_version=version)
+            db.session.add(created[key])
+    if created:
+        db.session.flush()
+        resolved.update({key: category.id for key, category in created.items()})
+    return resolved
+
+def insert_transactions(fam_id, rows):
+    """Insert validated transaction payloads as one batch; returns their ids.
+
+    Categories are resolved once for the batch, rows go in as a single
+    executemany / multi-row VALUES insert, and the rollup is updated once per
+    bucket. Bumps the family's data version; the caller commits.
+    """
+    category_ids = resolve_categories(fam_id, {fields["category"] for fields in rows})
+    version = bump_family_version(fam_id)
+    values = [
+        {
+            "family_id": fam_id,
+            "category_id": category_ids[fields["category"]],
+            "amount_cents": fields["amount_cents"],
+            "transaction_type": fields["type"],
+            "note": fields["description"],
+            "occurred_at": fields["occurred_at"],
+            "change_version": version
+        }
+        for fields in rows
+    ]
+    ids = db.session.execute(
+        db.insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+        values
+    ).scalars().all()
+
+    # Merge rows sharing a rollup bucket so each bucket is upserted once
+    buckets = {}
+    for row in values:
+        delta = rollup_delta(row["family_id"], row["occurred_at"], row["category_id"],
+                             row["transaction_type"], row["amount_cents"])
+        key = (delta["family_id"], delta["month"], delta["category_id"], delta["transaction_type"])
+        if key in buckets:
+            buckets[key]["total_cents"] += delta["total_cents"]
+            buckets[key]["count"] += delta["count"]
+        else:
+            buckets[key] = delta
+    apply_rollup_deltas(list(buckets.values()))
+    return ids
+
+def read_bulk_payload():
+    """Rows of a bulk request: a JSON array, or NDJSON with one object per line.
+
+    Unparseable NDJSON lines are returned as ValueError instances so they can
+    be reported per row. Raises RequestEntityTooLarge as soon as the body is
+    known to exceed BULK_MAX_BYTES or BULK_MAX_ROWS, without reading the rest.
+    """
+    if (request.content_length or 0) > BULK_MAX_BYTES:
+        raise RequestEntityTooLarge()
+
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        rows = []
+        size = 0
+        for line in request.stream:
+            size += len(line)
+            if size > BULK_MAX_BYTES:
+                raise RequestEntityTooLarge()
+            if not line.strip():
+                continue
+            if len(rows) == BULK_MAX_ROWS:
+                raise RequestEntityTooLarge()
+            try:
+                rows.append(app.json.loads(line))
+            except ValueError:  # JSONDecodeError / UnicodeDecodeError
+                rows.append(ValueError("Invalid JSON line"))
+        return rows
+
+    body = request.stream.read(BULK_MAX_BYTES + 1)
+    if len(body) > BULK_MAX_BYTES:
+        raise RequestEntityTooLarge()
+    try:
+        data = app.json.loads(body)
+    except ValueError:
+        data = None
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of transactions")
+    if len(data) > BULK_MAX_ROWS:
+        raise RequestEntityTooLarge()
+    return data
+
+def parse_date_arg(name):
+    """Parse an optional YYYY-MM-DD query parameter (ValueError if malformed)."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def transaction_filters_from_request():
+    """transactions_query() filter kwargs from the from/to/type/category args."""
+    return {
+        "date_from": parse_date_arg("from"),
+        "date_to": parse_date_arg("to"),
+        "transaction_type": request.args.get("type"),
+        "category": request.args.get("category")
+    }
+
+def encode_cursor(occurred_at, transaction_id):
+    """Opaque pagination cursor for the (occurred_at, id) listing order."""
+    raw = f"{occurred_at.isoformat()}|{transaction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; None passes through, garbage raises ValueError."""
+    if not cursor:
+        return None
+    try:
+        occurred_at, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(occurred_at), int(transaction_id)
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+
 # ------------------ Routes ------------------
 @app.route("/")
 def root():
@@ -1172,6 +2347,14 @@ def history_page():
                             <option value="bill">Bill</option>
                         </select>
                     </div>
+                    <div>
+                        <label>Group By</label>
+                        <select id="granularity">
+                            <option value="day">Day</option>
+                            <option value="week">Week</option>
+                            <option value="month" selected>Month</option>
+                        </select>
+                    </div>
                     <div>
                         <button class="nav-btn" onclick="applyFilters()" style="margin-top: 25px;">Apply Filters</button>
                     </div>
@@ -1185,7 +2368,7 @@ def history_page():
                 </div>
                 
                 <div class="chart-container">
-                    <h3>📊 Monthly Overview</h3>
+                    <h3>📊 Overview</h3>
                     <canvas id="monthlyChart" width="300" height="300"></canvas>
                 </div>
             </div>
@@ -1195,6 +2378,9 @@ def history_page():
                 <div id="transactionsList">
                     <div class="no-data">Loading transactions...</div>
                 </div>
+                <div style="text-align: center;">
+                    <button id="loadMoreBtn" class="nav-btn" onclick="loadMore()" style="display: none; margin-top: 15px;">Load More</button>
+                </div>
             </div>
         </div>
         
@@ -1214,15 +2400,34 @@ def history_page():
             document.getElementById('toDate').value = today.toISOString().split('T')[0];
             document.getElementById('fromDate').value = thirtyDaysAgo.toISOString().split('T')[0];
             
-            async function loadTransactions() {
+            let nextCursor = null;
+            
+            function transactionsQuery() {
+                const params = new URLSearchParams();
+                const fromDate = document.getElementById('fromDate').value;
+                const toDate = document.getElementById('toDate').value;
+                const typeFilter = document.getElementById('typeFilter').value;
+                if (fromDate) params.set('from', fromDate);
+                if (toDate) params.set('to', toDate);
+                if (typeFilter) params.set('type', typeFilter);
+                return params;
+            }
+            
+            async function loadTransactions(append = false) {
                 try {
-                    const response = await fetch('/api/budget/transactions', {
+                    const params = transactionsQuery();
+                    if (append && nextCursor) params.set('cursor', nextCursor);
+                    
+                    const response = await fetch(`/api/budget/transactions?${params}`, {
                         headers: { 'Authorization': `Bearer ${token}` }
                     });
                     
                     if (response.ok) {
-                        allTransactions = await response.json();
-                        applyFilters();
+                        const page = await response.json();
+                        allTransactions = append ? allTransactions.concat(page.transactions) : page.transactions;
+                        nextCursor = page.next_cursor;
+                        document.getElementById('loadMoreBtn').style.display = nextCursor ? 'inline-block' : 'none';
+                        displayTransactions(allTransactions);
                     } else {
                         document.getElementById('transactionsList').innerHTML = '<div class="no-data">Error loading transactions</div>';
                     }
@@ -1233,20 +2438,13 @@ def history_page():
             }
             
             function applyFilters() {
-                const fromDate = document.getElementById('fromDate').value;
-                const toDate = document.getElementById('toDate').value;
-                const typeFilter = document.getElementById('typeFilter').value;
-                
-                let filtered = allTransactions.filter(t => {
-                    const tDate = new Date(t.date);
-                    const matchesDate = (!fromDate || tDate >= new Date(fromDate)) && 
-                                       (!toDate || tDate <= new Date(toDate));
-                    const matchesType = !typeFilter || t.type === typeFilter;
-                    return matchesDate && matchesType;
-                });
-                
-                displayTransactions(filtered);
-                updateCharts(filtered);
+                nextCursor = null;
+                loadTransactions();
+                loadCharts();
+            }
+            
+            function loadMore() {
+                loadTransactions(true);
             }
             
             function displayTransactions(transactions) {
@@ -1273,20 +2471,27 @@ def history_page():
                 container.innerHTML = html;
             }
             
-            function updateCharts(transactions) {
-                updateExpenseChart(transactions);
-                updateMonthlyChart(transactions);
+            // Charts are drawn from server-side aggregates, not the loaded pages
+            async function loadCharts() {
+                try {
+                    const params = transactionsQuery();
+                    params.set('granularity', document.getElementById('granularity').value);
+                    
+                    const response = await fetch(`/api/budget/timeseries?${params}`, {
+                        headers: { 'Authorization': `Bearer ${token}` }
+                    });
+                    
+                    if (response.ok) {
+                        const timeseries = await response.json();
+                        updateExpenseChart(timeseries.categories);
+                        updateMonthlyChart(timeseries.series);
+                    }
+                } catch (error) {
+                    console.error('Error loading charts:', error);
+                }
             }
             
-            function updateExpenseChart(transactions) {
-                const expenses = transactions.filter(t => t.type === 'expense' || t.type === 'bill');
-                const categories = {};
-                
-                expenses.forEach(t => {
-                    const category = t.category || 'Other';
-                    categories[category] = (categories[category] || 0) + t.amount;
-                });
-                
+            function updateExpenseChart(categories) {
                 const ctx = document.getElementById('expenseChart').getContext('2d');
                 
                 if (expenseChart) {
@@ -1296,9 +2501,9 @@ def history_page():
                 expenseChart = new Chart(ctx, {
                     type: 'pie',
                     data: {
-                        labels: Object.keys(categories),
+                        labels: categories.map(c => c.name),
                         datasets: [{
-                            data: Object.values(categories),
+                            data: categories.map(c => c.amount),
                             backgroundColor: ['#f44336', '#ff9800', '#9c27b0', '#2196f3', '#4caf50']
                         }]
                     },
@@ -1313,21 +2518,11 @@ def history_page():
                 });
             }
             
-            function updateMonthlyChart(transactions) {
-                const monthly = {};
-                
-                transactions.forEach(t => {
-                    const month = new Date(t.date).toLocaleDateString('en-US', { month: 'short', year: 'numeric' });
-                    if (!monthly[month]) {
-                        monthly[month] = { income: 0, expenses: 0, bills: 0 };
-                    }
-                    monthly[month][t.type] += t.amount;
-                });
-                
-                const months = Object.keys(monthly).sort();
-                const incomeData = months.map(m => monthly[m].income);
-                const expenseData = months.map(m => monthly[m].expenses);
-                const billData = months.map(m => monthly[m].bills);
+            function updateMonthlyChart(series) {
+                const months = series.map(p => p.period);
+                const incomeData = series.map(p => p.income);
+                const expenseData = series.map(p => p.expense);
+                const billData = series.map(p => p.bill);
                 
                 const ctx = document.getElementById('monthlyChart').getContext('2d');
                 
@@ -1368,23 +2563,19 @@ def history_page():
                 });
             }
             
-            function exportData() {
+            async function exportData() {
                 const fromDate = document.getElementById('fromDate').value;
                 const toDate = document.getElementById('toDate').value;
-                const typeFilter = document.getElementById('typeFilter').value;
                 
-                let filtered = allTransactions.filter(t => {
-                    const tDate = new Date(t.date);
-                    const matchesDate = (!fromDate || tDate >= new Date(fromDate)) && 
-                                       (!toDate || tDate <= new Date(toDate));
-                    const matchesType = !typeFilter || t.type === typeFilter;
-                    return matchesDate && matchesType;
+                const response = await fetch(`/api/budget/transactions/export?${transactionsQuery()}`, {
+                    headers: { 'Authorization': `Bearer ${token}` }
                 });
+                if (!response.ok) {
+                    alert('Error exporting transactions');
+                    return;
+                }
                 
-                const csv = 'Date,Description,Amount (₪),Type\\n' + 
-                           filtered.map(t => `${t.date},"${t.description}",₪${t.amount},${t.type}`).join('\\n');
-                
-                const blob = new Blob([csv], { type: 'text/csv' });
+                const blob = await response.blob();
                 const url = window.URL.createObjectURL(blob);
                 const a = document.createElement('a');
                 a.href = url;
@@ -1410,6 +2601,7 @@ def history_page():
                     if (response.ok) {
                         // Reload transactions to update the display
                         loadTransactions();
+                        loadCharts();
                         alert('Transaction deleted successfully!');
                     } else {
                         const error = await response.json();
@@ -1423,6 +2615,7 @@ def history_page():
             
             // Load data when page loads
             loadTransactions();
+            loadCharts();
         </script>
     </body>
     </html>
@@ -1797,6 +2990,9 @@ def google_callback():
         if not authorization_code:
             return jsonify({"error": "Missing authorization code"}), 400
         
+        # Imported on first use to keep worker cold start light
+        import requests
+
         # Exchange authorization code for access token manually
         google_provider_cfg = get_google_provider_cfg()
         token_url = google_provider_cfg["token_endpoint"]
@@ -2051,11 +3247,13 @@ def get_user_info():
 # -------- Categories (protected) --------
 @app.route("/api/categories", methods=["GET"])
 @jwt_required()
+@use_read_replica
+@conditional_on_family_version
 def list_categories():
     fam_id = get_jwt()["family_id"]
-    cats = Category.query.filter_by(family_id=fam_id).order_by(Category.name).all()
+    cats = family_categories(fam_id)
     return jsonify([
-        {"id": c.id, "name": c.name, "monthly_budget": float(c.monthly_budget or 0)}
+        {"id": c["id"], "name": c["name"], "monthly_budget": from_cents(c["monthly_budget_cents"])}
         for c in cats
     ])
 
@@ -2065,66 +3263,40 @@ def create_category():
     fam_id = get_jwt()["family_id"]
     data = request.get_json(force=True)
     name = (data.get("name") or "").strip()
-    monthly = data.get("monthly_budget", 0)
+    try:
+        monthly_cents = to_cents(data.get("monthly_budget") or 0)
+    except ValueError:
+        return jsonify({"error": "monthly_budget must be a number"}), 400
 
     if not name:
         return jsonify({"error": "name is required"}), 400
+    if len(name) > Category.name.type.length:
+        return jsonify({"error": f"name is longer than {Category.name.type.length} characters"}), 400
+
+    # Bump first: it locks the family row, so a concurrent create of the same
+    # name waits here and then sees the committed row in the check below
+    version = bump_family_version(fam_id)
+    if Category.query.filter_by(family_id=fam_id, name=name).first():
+        db.session.rollback()
+        return jsonify({"error": "category already exists"}), 409
 
-    cat = Category(family_id=fam_id, name=name, monthly_budget=monthly)
+    cat = Category(family_id=fam_id, name=name, monthly_budget_cents=monthly_cents,
+                   change_version=version)
     db.session.add(cat)
     db.session.commit()
-    return jsonify({"id": cat.id, "name": cat.name, "monthly_budget": float(cat.monthly_budget or 0)}), 201
+    return jsonify({"id": cat.id, "name": cat.name, "monthly_budget": from_cents(cat.monthly_budget_cents)}), 201
 
 # -------- Budget API --------
 @app.route("/api/budget/summary", methods=["GET"])
 @auth_required
+@use_read_replica
+@conditional_on_family_version
 def budget_summary():
     fam_id = get_current_family_id()
-    
-    # Get all transactions for this family
-    from sqlalchemy import func
-    
-    # Calculate totals by type
-    income = db.session.query(func.sum(Transaction.amount)).filter_by(
-        family_id=fam_id, transaction_type='income'
-    ).scalar() or 0
-    
-    expenses = db.session.query(func.sum(Transaction.amount)).filter_by(
-        family_id=fam_id, transaction_type='expense'
-    ).scalar() or 0
-    
-    bills = db.session.query(func.sum(Transaction.amount)).filter_by(
-        family_id=fam_id, transaction_type='bill'
-    ).scalar() or 0
-    
-    balance = float(income) - float(expenses) - float(bills)
-    
-    # Get category breakdown for this month
-    from datetime import datetime, date
-    current_month = date.today().replace(day=1)
-    
-    category_totals = db.session.query(
-        Category.name,
-        func.sum(Transaction.amount).label('total')
-    ).join(Transaction).filter(
-        Transaction.family_id == fam_id,
-        Transaction.occurred_at >= current_month
-    ).group_by(Category.name).order_by(func.sum(Transaction.amount).desc()).all()
-    
-    categories = []
-    for cat_name, total in category_totals:
-        categories.append({
-            "name": cat_name,
-            "amount": float(total)
-        })
-    
-    return jsonify({
-        "balance": balance,
-        "income": float(income),
-        "expenses": float(expenses),
-        "bills": float(bills),
-        "categories": categories
-    })
+    summary = cached_family_read(
+        fam_id, ("summary", date.today()), lambda: compute_budget_summary(fam_id)
+    )
+    return jsonify(summary)
 
 @app.route("/api/budget/transaction", methods=["POST"])
 @auth_required
@@ -2132,96 +3304,349 @@ def add_transaction():
     fam_id = get_current_family_id()
     data = request.get_json(force=True)
     
-    transaction_type = data.get("type")
-    amount = data.get("amount")
-    description = data.get("description", "")
-    transaction_date = data.get("date")
-    category_id = data.get("categoryId")
-    
-    if not transaction_type or not amount or not category_id:
-        return jsonify({"error": "Type, amount, and category are required"}), 400
-    
-    if transaction_type not in ['income', 'expense', 'bill']:
-        return jsonify({"error": "Invalid transaction type"}), 400
-    
-    # Parse the date
-    occurred_at = datetime.utcnow()  # Default to now
-    if transaction_date:
-        try:
-            occurred_at = datetime.strptime(transaction_date, '%Y-%m-%d')
-        except ValueError:
-            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
-    
-    # Get or create the selected category
-    if category_id.isdigit():
-        # If it's a number, treat as category ID
-        category = Category.query.filter_by(id=int(category_id), family_id=fam_id).first()
-    else:
-        # If it's a string, treat as category name
-        category = Category.query.filter_by(name=category_id, family_id=fam_id).first()
+    try:
+        fields = parse_transaction_payload(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    transaction_type = fields["type"]
+    amount_cents = fields["amount_cents"]
+    description = fields["description"]
+    occurred_at = fields["occurred_at"]
     
-    # If category doesn't exist, create it
-    if not category:
-        category = Category(family_id=fam_id, name=str(category_id), monthly_budget=0)
-        db.session.add(category)
-        db.session.flush()
+    # Get or create the selected category (by ID if numeric, else by name);
+    # this also bumps the family's data version, which we stamp on the row
+    category_id = resolve_categories(fam_id, {fields["category"]})[fields["category"]]
+    version = bump_family_version(fam_id)
     
     # Create transaction
     transaction = Transaction(
         family_id=fam_id,
-        category_id=category.id,
-        amount=amount,
+        category_id=category_id,
+        amount_cents=amount_cents,
         transaction_type=transaction_type,
         note=description,
-        occurred_at=occurred_at
+        occurred_at=occurred_at,
+        change_version=version
     )
     
     db.session.add(transaction)
+    db.session.flush()
+    update_rollup(transaction)
     db.session.commit()
     
     return jsonify({
         "id": transaction.id,
         "type": transaction_type,
-        "amount": float(amount),
+        "amount": from_cents(amount_cents),
         "description": description
     }), 201
 
+@app.route("/api/budget/transactions/bulk", methods=["POST"])
+@auth_required
+def bulk_add_transactions():
+    """Insert many transactions in one DB transaction (JSON array or NDJSON body)."""
+    fam_id = get_current_family_id()
+    
+    try:
+        payloads = read_bulk_payload()
+    except RequestEntityTooLarge:
+        return jsonify({
+            "error": f"At most {BULK_MAX_ROWS} transactions and {BULK_MAX_BYTES // 2**20} MiB per request"
+        }), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Validate every row first; invalid rows are reported, valid ones inserted
+    results = [None] * len(payloads)
+    valid = []
+    for index, data in enumerate(payloads):
+        try:
+            if isinstance(data, ValueError):
+                raise data
+            if not isinstance(data, dict):
+                raise ValueError("Each transaction must be a JSON object")
+            valid.append((index, parse_transaction_payload(data)))
+        except ValueError as e:
+            results[index] = {"index": index, "status": "error", "error": str(e)}
+    
+    if valid:
+        ids = insert_transactions(fam_id, [fields for _, fields in valid])
+        db.session.commit()
+        
+        for (index, _), transaction_id in zip(valid, ids):
+            results[index] = {"index": index, "status": "created", "id": transaction_id}
+    
+    return jsonify({
+        "created": len(valid),
+        "failed": len(payloads) - len(valid),
+        "results": results
+    }), 200
+
+@app.route("/api/budget/transactions/import", methods=["POST"])
+@auth_required
+def import_transactions():
+    """Import a CSV or OFX bank statement upload, streamed in fixed-size batches.
+
+    Form fields: file, format (csv|ofx, default from the file extension),
+    <field>_column to map CSV headers (type, amount, date, description,
+    category), date_format for CSV dates and category for OFX rows.
+    """
+    fam_id = get_current_family_id()
+    upload = request.files.get("file")
+    if not upload:
+        return jsonify({"error": "file is required"}), 400
+    
+    file_format = (request.form.get("format") or upload.filename.rsplit(".", 1)[-1]).lower()
+    if file_format == "csv":
+        columns = {
+            field: request.form[f"{field}_column"]
+            for field in importers.DEFAULT_CSV_COLUMNS
+            if request.form.get(f"{field}_column")
+        }
+        rows = importers.iter_csv_rows(
+            upload.stream, columns, date_format=request.form.get("date_format", "%Y-%m-%d")
+        )
+    elif file_format in ("ofx", "qfx"):
+        rows = importers.iter_ofx_rows(
+            upload.stream, category=request.form.get("category") or importers.DEFAULT_CATEGORY
+        )
+    else:
+        return jsonify({"error": "Unsupported format. Use csv or ofx"}), 400
+    
+    created = failed = 0
+    errors = []
+    batch = []
+    try:
+        for line, payload in rows:
+            try:
+                if isinstance(payload, ValueError):
+                    raise payload
+                batch.append(parse_transaction_payload(payload, require_date=True))
+            except ValueError as e:
+                failed += 1
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({"line": line, "error": str(e)})
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                insert_transactions(fam_id, batch)
+                db.session.commit()
+                created += len(batch)
+                batch = []
+        if batch:
+            insert_transactions(fam_id, batch)
+            db.session.commit()
+            created += len(batch)
+    except csv.Error as e:
+        db.session.rollback()
+        return jsonify({"error": f"Malformed CSV: {e}", "created": created, "failed": failed}), 400
+    
+    return jsonify({"created": created, "failed": failed, "errors": errors}), 200
+
 @app.route("/api/categories", methods=["GET"])
 @jwt_required()
+@use_read_replica
 def get_categories():
     fam_id = get_jwt()["family_id"]
     
     # Get all categories for this family
-    categories = Category.query.filter_by(family_id=fam_id).order_by(Category.name).all()
+    categories = family_categories(fam_id)
     
     return jsonify([
         {
-            "id": cat.id,
-            "name": cat.name,
-            "budget": float(cat.monthly_budget)
+            "id": cat["id"],
+            "name": cat["name"],
+            "budget": from_cents(cat["monthly_budget_cents"])
         }
         for cat in categories
     ])
 
 @app.route("/api/budget/transactions", methods=["GET"])
 @auth_required
+@use_read_replica
+@conditional_on_family_version
 def get_transactions():
     fam_id = get_current_family_id()
     
-    # Get all transactions for this family
-    transactions = Transaction.query.filter_by(family_id=fam_id).order_by(Transaction.occurred_at.desc()).all()
+    try:
+        filters = transaction_filters_from_request()
+        cursor = decode_cursor(request.args.get("cursor"))
+        limit = min(int(request.args.get("limit", TRANSACTIONS_PAGE_SIZE)), TRANSACTIONS_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "Invalid query parameters. Dates use YYYY-MM-DD"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
     
-    return jsonify([
-        {
-            "id": t.id,
-            "date": t.occurred_at.isoformat(),
-            "description": t.note or "No description",
-            "amount": float(t.amount),
-            "type": t.transaction_type,
-            "category": t.category.name if t.category else "Unknown"
-        }
-        for t in transactions
-    ])
+    query = transactions_query(fam_id, cursor=cursor, **filters)
+    transactions = query.limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        next_cursor = encode_cursor(last.occurred_at, last.id)
+    
+    return jsonify({
+        "transactions": [transaction_json(t) for t in transactions],
+        "next_cursor": next_cursor
+    })
+
+@app.route("/api/budget/timeseries", methods=["GET"])
+@auth_required
+@use_read_replica
+@conditional_on_family_version
+def get_timeseries():
+    """Bucketed totals for charts: ?granularity=day|week|month&from&to&type&category."""
+    fam_id = get_current_family_id()
+    granularity = request.args.get("granularity", "month")
+    if granularity not in TIMESERIES_GRANULARITIES:
+        return jsonify({"error": "granularity must be day, week or month"}), 400
+    try:
+        filters = transaction_filters_from_request()
+    except ValueError:
+        return jsonify({"error": "Invalid query parameters. Dates use YYYY-MM-DD"}), 400
+    return jsonify(compute_timeseries(fam_id, granularity, **filters))
+
+@app.route("/api/budget/variance", methods=["GET"])
+@auth_required
+@use_read_replica
+@conditional_on_family_version
+def get_budget_variance():
+    """Budget vs. actual per category for ?month=YYYY-MM (default: this month)."""
+    fam_id = get_current_family_id()
+    month_arg = request.args.get("month")
+    try:
+        month = datetime.strptime(month_arg, "%Y-%m").date() if month_arg else date.today().replace(day=1)
+    except ValueError:
+        return jsonify({"error": "month must be YYYY-MM"}), 400
+    return jsonify(compute_budget_variance(fam_id, month))
+
+@app.route("/api/budget/changes", methods=["GET"])
+@auth_required
+@use_read_replica
+def get_changes():
+    """Transactions and categories created or deleted since a change cursor.
+
+    Pass the returned `cursor` as `since` on the next call (`since=0` starts a
+    full sync) and repeat while `has_more` is true. Clients keep a local copy
+    and apply the delta instead of re-downloading the ledger.
+
+    Transactions come in pages of at most `limit`, ordered by
+    (change_version, id); a partial page's cursor is "<version>.<id>" of its
+    last row. Categories and tombstones of the versions covered by the page
+    are returned with it.
+    """
+    fam_id = get_current_family_id()
+    try:
+        since, _, after_id = request.args.get("since", "0").partition(".")
+        since, after_id = int(since), int(after_id) if after_id else None
+        limit = min(int(request.args.get("limit", CHANGES_PAGE_SIZE)), CHANGES_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "since must be a cursor returned by this endpoint"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    # Read the cursor first: every row stamped <= cursor is already committed
+    cursor = db.session.query(Family.data_version).filter_by(id=fam_id).scalar()
+    if since > cursor or since < 0:
+        return jsonify({"error": "Unknown cursor, resync with since=0"}), 400
+    # A full sync also returns rows stamped 0 (created before change tracking)
+    lower = since if since or after_id is not None else -1
+
+    def page(model):
+        query = ledger_query(model, fam_id).add_columns(
+            model.change_version.label("change_version")
+        ).filter(model.change_version <= cursor)
+        if after_id is None:
+            query = query.filter(model.change_version > lower)
+        else:
+            query = query.filter(db.tuple_(model.change_version, model.id) > (since, after_id))
+        return query.order_by(model.change_version, model.id).limit(limit + 1).all()
+
+    # Ids are unique across both tables (archiving moves rows), so merging
+    # the two ordered pages gives the combined (change_version, id) order
+    rows = list(heapq.merge(*(page(model) for model in (Transaction, TransactionArchive)),
+                            key=lambda t: (t.change_version, t.id)))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    upper = rows[-1].change_version if has_more else cursor
+
+    def changed(column):
+        return db.and_(column > lower, column <= upper)
+
+    return jsonify({
+        "cursor": f"{upper}.{rows[-1].id}" if has_more else str(cursor),
+        "has_more": has_more,
+        "transactions": [transaction_json(t) for t in rows],
+        "deleted_transactions": db.session.execute(
+            db.select(TransactionTombstone.transaction_id).where(
+                TransactionTombstone.family_id == fam_id, changed(TransactionTombstone.change_version)
+            )
+        ).scalars().all(),
+        "categories": [
+            {"id": c.id, "name": c.name, "monthly_budget": from_cents(c.monthly_budget_cents)}
+            for c in db.session.execute(
+                db.select(Category.id, Category.name, Category.monthly_budget_cents).where(
+                    Category.family_id == fam_id, changed(Category.change_version)
+                )
+            )
+        ]
+    })
+
+@app.route("/api/budget/transactions/export", methods=["GET"])
+@auth_required
+@use_read_replica
+def export_transactions():
+    """Stream the family's ledger as CSV (default) or JSON Lines.
+
+    Rows are read through a server-side cursor in EXPORT_FETCH_SIZE chunks and
+    written out as they arrive, so memory stays flat regardless of ledger size.
+    Accepts the same from/to/type/category filters as the listing.
+    """
+    fam_id = get_current_family_id()
+    export_format = request.args.get("format", "csv").lower()
+    if export_format not in ("csv", "jsonl"):
+        return jsonify({"error": "Unsupported format. Use csv or jsonl"}), 400
+    try:
+        filters = transaction_filters_from_request()
+    except ValueError:
+        return jsonify({"error": "Invalid query parameters. Dates use YYYY-MM-DD"}), 400
+    
+    rows = transactions_query(fam_id, **filters).yield_per(EXPORT_FETCH_SIZE)
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["id", "date", "description", "amount", "type", "category"])
+        for t in rows:
+            writer.writerow([t.id, t.occurred_at.isoformat(), t.note or "", format_cents(t.amount_cents),
+                             t.transaction_type, t.category_name or ""])
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    def generate_jsonl():
+        for t in rows:
+            yield app.json.dumps({
+                "id": t.id,
+                "date": t.occurred_at.isoformat(),
+                "description": t.note or "",
+                "amount": format_cents(t.amount_cents),
+                "type": t.transaction_type,
+                "category": t.category_name
+            }) + "\n"
+    
+    if export_format == "csv":
+        body, mimetype = generate_csv(), "text/csv"
+    else:
+        body, mimetype = generate_jsonl(), "application/x-ndjson"
+    
+    filename = f"transactions_{date.today().isoformat()}.{export_format}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @app.route("/api/budget/transaction/<int:transaction_id>", methods=["DELETE"])
 @auth_required
@@ -2230,12 +3655,20 @@ def delete_transaction(transaction_id):
     
     # Find the transaction and make sure it belongs to the user's family
     transaction = Transaction.query.filter_by(id=transaction_id, family_id=fam_id).first()
+    if not transaction:
+        # Old transactions may have been moved to the archive
+        transaction = TransactionArchive.query.filter_by(id=transaction_id, family_id=fam_id).first()
     
     if not transaction:
         return jsonify({"error": "Transaction not found or access denied"}), 404
     
     try:
+        version = bump_family_version(fam_id)
+        update_rollup(transaction, sign=-1)
         db.session.delete(transaction)
+        db.session.add(TransactionTombstone(
+            family_id=fam_id, transaction_id=transaction.id, change_version=version
+        ))
         db.session.commit()
         return jsonify({"message": "Transaction deleted successfully"}), 200
     except Exception as e:
@@ -2244,16 +3677,19 @@ def delete_transaction(transaction_id):
 
 # ------------------ Bootstrap ------------------
 def init_db():
-    """Initialize database with retry logic"""
-    import time
+    """Wait until the database accepts connections, with retry logic.
+
+    Creates nothing: the schema is created by migration 1 (migrations.py),
+    under the migration lock.
+    """
     max_retries = 30
     retry_count = 0
     
     while retry_count < max_retries:
         try:
-            with app.app_context():
-                db.create_all()
-            print("✅ Database initialized successfully!")
+            with app.app_context(), db.engine.connect() as conn:
+                conn.execute(db.text("SELECT 1"))
+            print("✅ Database is reachable")
             return
         except Exception as e:
             retry_count += 1
@@ -2263,39 +3699,158 @@ def init_db():
                 raise
             time.sleep(2)
 
-# Initialize database when module is imported
-def migrate_db():
-    """Add missing columns to existing tables"""
-    try:
-        with app.app_context():
-            # Check if transaction_type column exists
-            result = db.session.execute(db.text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name='transactions' AND column_name='transaction_type'
-            """)).fetchone()
-            
-            if not result:
-                print("Adding transaction_type column...")
-                db.session.execute(db.text("""
-                    ALTER TABLE transactions 
-                    ADD COLUMN transaction_type VARCHAR(50) DEFAULT 'expense'
-                """))
-                db.session.commit()
-                print("✅ Added transaction_type column")
-            else:
-                print("✅ transaction_type column already exists")
-                
-    except Exception as e:
-        print(f"Migration error: {e}")
-        # If migration fails, recreate all tables
-        print("Recreating all tables...")
-        db.drop_all()
-        db.create_all()
-        print("✅ Tables recreated")
+# -------- Month partitions (PostgreSQL) --------
+def add_months(month, n):
+    """First day of the month `n` months after `month`'s month."""
+    years, index = divmod(month.month - 1 + n, 12)
+    return date(month.year + years, index + 1, 1)
+
+def is_partitioned(conn, table):
+    return conn.execute(db.text("""
+        SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = :table
+    """), {"table": table}).first() is not None
 
-init_db()
-migrate_db()
+def partition_names(conn, table):
+    """Partitions of a partitioned table (or child indexes of a partitioned index)."""
+    return set(conn.execute(db.text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :table
+    """), {"table": table}).scalars())
+
+def ensure_month_partitions(conn, table, first_month, last_month):
+    """Create the monthly occurred_at partitions of `table` from first to last month.
+
+    A DEFAULT partition catches rows outside the prepared range; when their
+    month gets its own partition they are moved into it before attaching.
+    Returns the names of the partitions created.
+    """
+    existing = partition_names(conn, table)
+    default = f"{table}_default"
+    if default not in existing:
+        conn.execute(db.text(f"CREATE TABLE {default} PARTITION OF {table} DEFAULT"))
+
+    created = []
+    month = date(first_month.year, first_month.month, 1)
+    while month <= last_month:
+        name = f"{table}_y{month:%Y}m{month:%m}"
+        upper = add_months(month, 1)
+        if name not in existing:
+            conn.execute(db.text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+            conn.execute(db.text(f"""
+                WITH moved AS (
+                    DELETE FROM {default} WHERE occurred_at >= :lower AND occurred_at < :upper
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            """), {"lower": month, "upper": upper})
+            conn.execute(db.text(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{month}') TO ('{upper}')"
+            ))
+            created.append(name)
+        month = upper
+    return created
+
+# -------- Cold archive --------
+def archive_family_transactions(fam_id, cutoff):
+    """Move the family's transactions older than `cutoff` to transactions_archive.
+
+    The monthly rollup is left as is: it keeps summarizing archived months,
+    so summaries and reports never read the archive. Commits; returns the
+    number of rows moved.
+    """
+    # Writers bump before inserting, so holding the family row lock keeps
+    # new old-dated rows from slipping between the copy and the delete
+    bump_family_version(fam_id)
+    hot = Transaction.__table__
+    old = db.and_(hot.c.family_id == fam_id, hot.c.occurred_at < cutoff)
+    columns = [column.name for column in hot.columns]
+    moved = db.session.execute(
+        TransactionArchive.__table__.insert().from_select(columns, db.select(*hot.columns).where(old))
+    ).rowcount
+    db.session.execute(hot.delete().where(old))
+    db.session.execute(db.update(Family).where(Family.id == fam_id).values(archived_before=case(
+        (Family.archived_before > cutoff, Family.archived_before), else_=cutoff
+    )))
+    db.session.commit()
+    return moved
+
+@app.cli.command("archive-transactions")
+@click.option("--months", default=ARCHIVE_AFTER_MONTHS, show_default=True,
+              help="Archive transactions older than this many whole months.")
+@click.option("--family-id", type=int, default=None, help="Only archive this family.")
+def archive_transactions_command(months, family_id):
+    """Move old transactions of every family into transactions_archive."""
+    cutoff = datetime.combine(add_months(date.today(), -months), datetime.min.time())
+    families = [family_id] if family_id else db.session.execute(db.select(Family.id)).scalars().all()
+    total = 0
+    for fam_id in families:
+        has_old = db.session.query(Transaction.id).filter(
+            Transaction.family_id == fam_id, Transaction.occurred_at < cutoff
+        ).first()
+        if has_old:
+            moved = archive_family_transactions(fam_id, cutoff)
+            total += moved
+            print(f"📦 Family {fam_id}: archived {moved} transactions before {cutoff.date()}")
+    print(f"✅ Archived {total} transactions")
+
+@app.cli.command("rebuild-rollup")
+def rebuild_rollup_command():
+    """Rebuild family_monthly_rollup from the transactions table."""
+    rebuild_rollup()
+    print("✅ Rollup rebuilt")
+
+# Index each hot query is expected to use, checked by `flask check-indexes`
+HOT_QUERY_INDEXES = {
+    "summary": "uq_rollup_bucket",
+    "listing": "ix_transactions_family_occurred",
+    "listing by type": "ix_transactions_family_type",
+}
+
+def explain(query):
+    """Return the database's query plan for an ORM query as one string."""
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    prefix = "EXPLAIN QUERY PLAN " if db.engine.dialect.name == "sqlite" else "EXPLAIN "
+    with db.engine.connect() as conn:
+        if db.engine.dialect.name == "postgresql":
+            # Tiny tables make sequential scans look cheaper; we only want to
+            # know whether the index is usable for the query shape.
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        rows = conn.exec_driver_sql(prefix + str(compiled), params).fetchall()
+    return "\n".join(str(row[-1]) for row in rows)
+
+@app.cli.command("check-indexes")
+def check_indexes_command():
+    """EXPLAIN the summary and listing queries and verify their indexes."""
+    import sys
+    fam_id = 0
+    queries = {
+        "summary": budget_summary_query(fam_id),
+        "listing": transactions_query(fam_id).limit(TRANSACTIONS_PAGE_SIZE),
+        "listing by type": db.session.query(func.count(Transaction.id)).filter(
+            Transaction.family_id == fam_id, Transaction.transaction_type == "expense"
+        ),
+    }
+    ok = True
+    for name, query in queries.items():
+        plan = explain(query)
+        index = HOT_QUERY_INDEXES[name]
+        # On a partitioned table the plan names each partition's child index
+        candidates = {index}
+        if db.engine.dialect.name == "postgresql":
+            with db.engine.connect() as conn:
+                candidates |= partition_names(conn, index)
+        used = any(candidate in plan for candidate in candidates)
+        ok = ok and used
+        print(f"{'✅' if used else '❌'} {name}: expects {HOT_QUERY_INDEXES[name]}")
+        print("    " + plan.replace("\n", "\n    "))
+    if not ok:
+        sys.exit(1)
 
 def create_default_categories():
     """Create default categories for all families"""
@@ -2305,7 +3860,9 @@ def create_default_categories():
             families = Family.query.all()
             
             for family in families:
-                # Check if family already has categories
+                # Bump first: it locks the family row, so a concurrent
+                # bootstrap (or /demo) waits here and then sees our categories
+                version = bump_family_version(family.id)
                 existing_categories = Category.query.filter_by(family_id=family.id).count()
                 
                 if existing_categories == 0:
@@ -2325,20 +3882,43 @@ def create_default_categories():
                         category = Category(
                             family_id=family.id,
                             name=cat_data["name"],
-                            monthly_budget=cat_data["budget"]
+                            monthly_budget_cents=cat_data["budget"] * 100,
+                            change_version=version
                         )
                         db.session.add(category)
                     
                     db.session.commit()
                     print(f"✅ Created default categories for family: {family.name}")
                 else:
+                    db.session.rollback()  # nothing written: release the lock, keep the version
                     print(f"⏭️ Family {family.name} already has {existing_categories} categories")
                 
     except Exception as e:
         print(f"Error creating default categories: {e}")
 
-create_default_categories()
+# Bootstrap (init_db, migrations, default categories) runs once per deploy via
+# migrations.py or the gunicorn on_starting hook, never per worker import.
+_first_request_seen = False
+
+@app.before_request
+def record_first_request():
+    global _first_request_seen
+    if not _first_request_seen:
+        _first_request_seen = True
+        invalidation_bus.start()
+        # Workers forked after the app was imported start with fresh
+        # multiprocess samples, so publish the import time again
+        startup_import_seconds.set(_import_seconds)
+        elapsed = time.perf_counter() - _import_started
+        startup_first_request_seconds.set(elapsed)
+        print(f"⏱️  First request served {elapsed:.3f}s after import started")
+
+_import_seconds = time.perf_counter() - _import_started
+startup_import_seconds.set(_import_seconds)
+print(f"⏱️  main imported in {_import_seconds:.3f}s")
 
 if __name__ == "__main__":
-    # For dev only; in container Gunicorn runs this module
+    # For dev only (apply `python migrations.py` first); in container Gunicorn runs this module
+    init_db()
+    create_default_categories()
     app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations and one-time bootstrap for the Budget App.
+
+Run once per deploy (init container / release step), never from app workers:
+
+    python migrations.py
+
+The gunicorn on_starting hook (gunicorn.conf.py) runs this script when
+BOOTSTRAP_ON_START is enabled, i.e. once per server start, before workers fork.
+
+With PARTITION_TRANSACTIONS on PostgreSQL, bootstrap also converts
+transactions into a month-partitioned table (once) and creates the partitions
+for the coming PARTITION_MONTHS_AHEAD months (every run).
+
+Each step runs in its own transaction together with the row recording it in
+schema_version, so a failed step leaves the database at the previous version.
+On PostgreSQL an advisory lock makes concurrent runners (e.g. two pods
+rolling out at once) wait for each other instead of racing.
+"""
+
+import sys
+from datetime import date, datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect
+
+from main import (
+    PARTITION_MONTHS_AHEAD, PARTITION_TRANSACTIONS, FamilyMonthlyRollup, Transaction,
+    TransactionArchive, TransactionTombstone, add_months, app, create_default_categories, db,
+    ensure_month_partitions, init_db, is_partitioned, rollup_rebuild_statements
+)
+
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_ID = 727274
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+# ------------------ Steps ------------------
+# Every step must be idempotent: databases created before schema_version
+# existed replay all of them.
+
+def create_base_schema(conn):
+    """Create any missing model tables."""
+    db.metadata.create_all(bind=conn)
+
+def add_transaction_type(conn):
+    """Add transactions.transaction_type to pre-typed databases."""
+    columns = {c["name"] for c in inspect(conn).get_columns("transactions")}
+    if "transaction_type" not in columns:
+        conn.execute(db.text(
+            "ALTER TABLE transactions ADD COLUMN transaction_type VARCHAR(50) DEFAULT 'expense'"
+        ))
+
+def merge_duplicate_categories(conn):
+    """Fold same-named categories of a family into the oldest one."""
+    keep = "SELECT MIN(id) FROM categories GROUP BY family_id, name"
+    conn.execute(db.text(f"""
+        UPDATE transactions SET category_id = (
+            SELECT MIN(c2.id) FROM categories c1
+            JOIN categories c2 ON c2.family_id = c1.family_id AND c2.name = c1.name
+            WHERE c1.id = transactions.category_id
+        )
+        WHERE category_id NOT IN ({keep})
+    """))
+    conn.execute(db.text(f"DELETE FROM family_monthly_rollup WHERE category_id NOT IN ({keep})"))
+    conn.execute(db.text(f"DELETE FROM categories WHERE id NOT IN ({keep})"))
+
+def create_indexes(conn):
+    """Create model indexes missing from tables that predate them."""
+    for table in db.metadata.sorted_tables:
+        existing = column_names(conn, table.name)
+        for index in table.indexes:
+            # Indexes on columns added by a later step are created by that step
+            if {c.name for c in index.columns} <= existing:
+                index.create(bind=conn, checkfirst=True)
+
+def column_names(conn, table):
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+def backfill_rollup(conn):
+    """Populate family_monthly_rollup from existing transactions."""
+    # Databases still storing Numeric amounts get their rollup rebuilt by
+    # the integer-cents step instead
+    if "amount_cents" not in column_names(conn, "transactions"):
+        return
+    for stmt in rollup_rebuild_statements(models=[Transaction]):
+        conn.execute(stmt)
+
+def convert_money_to_cents(conn):
+    """Replace Numeric(12,2) money columns with BIGINT minor units."""
+    converted = False
+    for table, old, new in [
+        ("transactions", "amount", "amount_cents"),
+        ("categories", "monthly_budget", "monthly_budget_cents"),
+    ]:
+        columns = column_names(conn, table)
+        if old not in columns:
+            continue
+        if new not in columns:
+            conn.execute(db.text(f"ALTER TABLE {table} ADD COLUMN {new} BIGINT NOT NULL DEFAULT 0"))
+        conn.execute(db.text(
+            f"UPDATE {table} SET {new} = CAST(ROUND(COALESCE({old}, 0) * 100) AS BIGINT)"
+        ))
+        conn.execute(db.text(f"ALTER TABLE {table} DROP COLUMN {old}"))
+        converted = True
+
+    # The rollup is derived data: recreate it with the new column and refill
+    rollup = FamilyMonthlyRollup.__table__
+    if "total_cents" not in column_names(conn, rollup.name):
+        rollup.drop(bind=conn)
+        rollup.create(bind=conn)
+        converted = True
+    if converted:
+        # Nothing can be archived before the archive step below
+        for stmt in rollup_rebuild_statements(models=[Transaction]):
+            conn.execute(stmt)
+
+def add_family_data_version(conn):
+    """Add families.data_version, the per-family change counter behind ETags."""
+    if "data_version" not in column_names(conn, "families"):
+        conn.execute(db.text(
+            "ALTER TABLE families ADD COLUMN data_version BIGINT NOT NULL DEFAULT 0"
+        ))
+
+def add_change_versions(conn):
+    """Add change_version (delta sync cursor) to transactions and categories."""
+    for table in ("transactions", "categories"):
+        if "change_version" not in column_names(conn, table):
+            conn.execute(db.text(
+                f"ALTER TABLE {table} ADD COLUMN change_version BIGINT NOT NULL DEFAULT 0"
+            ))
+            # Existing rows count as created at the family's current version
+            conn.execute(db.text(f"""
+                UPDATE {table} SET change_version = (
+                    SELECT data_version FROM families WHERE families.id = {table}.family_id
+                )
+            """))
+    TransactionTombstone.__table__.create(bind=conn, checkfirst=True)
+    create_indexes(conn)
+
+def add_transactions_archive(conn):
+    """Add families.archived_before and the transactions_archive table."""
+    if "archived_before" not in column_names(conn, "families"):
+        conn.execute(db.text("ALTER TABLE families ADD COLUMN archived_before TIMESTAMP"))
+    TransactionArchive.__table__.create(bind=conn, checkfirst=True)
+    create_indexes(conn)
+
+MIGRATIONS = [
+    (1, "base schema", create_base_schema),
+    (2, "transactions.transaction_type", add_transaction_type),
+    (3, "merge duplicate categories", merge_duplicate_categories),
+    (4, "composite indexes", create_indexes),
+    (5, "backfill family_monthly_rollup", backfill_rollup),
+    (6, "integer cents money columns", convert_money_to_cents),
+    (7, "families.data_version", add_family_data_version),
+    (8, "change versions and transaction tombstones", add_change_versions),
+    (9, "transactions archive", add_transactions_archive),
+]
+
+# ------------------ Runner ------------------
+def acquire_lock(conn):
+    if conn.dialect.name == "postgresql":
+        conn.execute(db.text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        conn.commit()
+
+def release_lock(conn):
+    if conn.dialect.name == "postgresql":
+        conn.execute(db.text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+        conn.commit()
+
+def run_migrations():
+    """Apply pending migrations; returns the list of versions applied."""
+    applied_now = []
+    with app.app_context(), db.engine.connect() as conn:
+        acquire_lock(conn)
+        try:
+            with conn.begin():
+                schema_version.create(bind=conn, checkfirst=True)
+            applied = set(conn.execute(db.select(schema_version.c.version)).scalars())
+            conn.rollback()
+
+            for version, description, step in MIGRATIONS:
+                if version in applied:
+                    continue
+                print(f"⏳ Applying migration {version}: {description}")
+                with conn.begin():
+                    step(conn)
+                    conn.execute(schema_version.insert().values(
+                        version=version, description=description, applied_at=datetime.utcnow()
+                    ))
+                applied_now.append(version)
+                print(f"✅ Migration {version} applied")
+        finally:
+            release_lock(conn)
+
+    if not applied_now:
+        print("✅ Schema is up to date")
+    return applied_now
+
+# ------------------ Partitioning ------------------
+def partition_transactions(conn):
+    """Rebuild transactions as a table range-partitioned by occurred_at month.
+
+    Copies every row under one transaction; the table is locked meanwhile.
+    The primary key becomes (id, occurred_at), since PostgreSQL requires the
+    partition key in unique constraints.
+    """
+    this_month = date.today().replace(day=1)
+    oldest = conn.execute(db.text("SELECT MIN(occurred_at) FROM transactions")).scalar()
+    sequence = conn.execute(db.text("SELECT pg_get_serial_sequence('transactions', 'id')")).scalar()
+
+    conn.execute(db.text("ALTER TABLE transactions RENAME TO transactions_unpartitioned"))
+    if sequence:
+        # Keep the id sequence alive when the old table is dropped
+        conn.execute(db.text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    conn.execute(db.text("""
+        CREATE TABLE transactions (LIKE transactions_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE (occurred_at)
+    """))
+    ensure_month_partitions(conn, "transactions", (oldest or this_month).replace(day=1),
+                            add_months(this_month, PARTITION_MONTHS_AHEAD))
+    conn.execute(db.text("INSERT INTO transactions SELECT * FROM transactions_unpartitioned"))
+    conn.execute(db.text("DROP TABLE transactions_unpartitioned"))
+    if sequence:
+        conn.execute(db.text(f"ALTER SEQUENCE {sequence} OWNED BY transactions.id"))
+
+    conn.execute(db.text("ALTER TABLE transactions ADD PRIMARY KEY (id, occurred_at)"))
+    conn.execute(db.text("ALTER TABLE transactions ADD FOREIGN KEY (family_id) REFERENCES families (id)"))
+    conn.execute(db.text("ALTER TABLE transactions ADD FOREIGN KEY (category_id) REFERENCES categories (id)"))
+    for index in Transaction.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+
+def run_partitioning():
+    """Partition transactions if enabled and create upcoming month partitions."""
+    if not PARTITION_TRANSACTIONS:
+        return
+    with app.app_context(), db.engine.connect() as conn:
+        if conn.dialect.name != "postgresql":
+            print("⚠️  PARTITION_TRANSACTIONS requires PostgreSQL; skipping")
+            return
+        acquire_lock(conn)
+        try:
+            with conn.begin():
+                if not is_partitioned(conn, "transactions"):
+                    print("⏳ Partitioning transactions by month")
+                    partition_transactions(conn)
+                this_month = date.today().replace(day=1)
+                created = ensure_month_partitions(conn, "transactions", this_month,
+                                                  add_months(this_month, PARTITION_MONTHS_AHEAD))
+            for name in created:
+                print(f"✅ Created partition {name}")
+        finally:
+            release_lock(conn)
+
+def bootstrap():
+    """Wait for the database, migrate it and seed default categories."""
+    init_db()
+    run_migrations()
+    run_partitioning()
+    create_default_categories()
+
+if __name__ == "__main__":
+    try:
+        bootstrap()
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,53 @@
+"""
+Shared fixtures: the Flask app on a throwaway SQLite database.
+
+The app reads DATABASE_URL when main is imported, so it is set here, before
+any test imports it. Modules are imported as gunicorn does (app/ on sys.path).
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+sys.path.insert(0, APP_DIR)
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+
+@pytest.fixture(scope="session")
+def app():
+    import main
+    from migrations import bootstrap
+    bootstrap()
+    return main.app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.get("/demo")  # session login as the demo family
+    return client
+
+
+@pytest.fixture
+def record_statements(app):
+    """Call to start recording SQL statements; returns the list they go into."""
+    from sqlalchemy import event
+    from main import db
+
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    def start():
+        statements.clear()
+        return statements
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield start
+    event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,42 @@
+"""Delta sync (/api/budget/changes) pagination."""
+
+
+def sync(client, since, limit):
+    """Page through /api/budget/changes from `since`; returns (pages, cursor)."""
+    pages = []
+    while True:
+        response = client.get(f"/api/budget/changes?since={since}&limit={limit}")
+        assert response.status_code == 200
+        body = response.get_json()
+        pages.append(body)
+        since = body["cursor"]
+        if not body["has_more"]:
+            return pages, since
+
+
+def bulk_add(client, count):
+    """Create `count` transactions in one request (one data version); returns their ids."""
+    response = client.post("/api/budget/transactions/bulk", json=[
+        {"type": "expense", "amount": "3.00", "categoryId": "Sync"} for _ in range(count)
+    ])
+    assert response.status_code == 200
+    return [result["id"] for result in response.get_json()["results"]]
+
+
+def test_changes_pages_through_one_version_and_deletes(client):
+    _, cursor = sync(client, 0, 1000)
+
+    created = bulk_add(client, 25)
+    pages, cursor = sync(client, cursor, 7)
+    ids = [t["id"] for page in pages for t in page["transactions"]]
+    assert len(pages) == 4
+    assert all("." in page["cursor"] for page in pages[:-1])
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == sorted(created)
+
+    deleted = created[3]
+    assert client.delete(f"/api/budget/transaction/{deleted}").status_code == 200
+    later = bulk_add(client, 10)
+    pages, _ = sync(client, cursor, 4)
+    assert [page["deleted_transactions"] for page in pages] == [[deleted], [], []]
+    assert sorted(t["id"] for page in pages for t in page["transactions"]) == sorted(later)
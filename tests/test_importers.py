@@ -0,0 +1,40 @@
+"""Statement parser edge cases (no database needed)."""
+
+import io
+
+import pytest
+
+import importers
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("12.50", "12.50"),
+    ("-12.5", "-12.5"),
+    ("+3", "3"),
+    ("₪1,234.50", "1234.50"),
+    ("USD 40", "40"),
+    ("12.50 ILS", "12.50"),
+    ("$-5", "-5"),
+    ("-$5", "-5"),
+    ("", ""),
+])
+def test_normalize_amount_accepts_plain_decimals(raw, expected):
+    assert importers.normalize_amount(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["1e3", "12,50", "1,23", "(5.00)", "$(5)", "--5", "5-", "abc", "1.2.3"])
+def test_normalize_amount_rejects_everything_else(raw):
+    with pytest.raises(ValueError):
+        importers.normalize_amount(raw)
+
+
+def test_csv_rows_skip_bom_and_report_bad_amounts():
+    data = "﻿date,description,amount\n2026-10-03,Coffee,-12.50\n2026-10-04,Refund,(5.00)\n"
+    rows = list(importers.iter_csv_rows(io.BytesIO(data.encode())))
+
+    line, payload = rows[0]
+    assert payload["date"] == "2026-10-03"
+    assert payload["type"] == "expense"
+    assert payload["amount"] == "12.50"
+    assert rows[1][0] == 3
+    assert isinstance(rows[1][1], ValueError)
@@ -0,0 +1,36 @@
+"""Statement-count guards for the hot read endpoints."""
+
+
+def add_transactions(client, count, offset=0):
+    # A distinct category per row, so a per-row category load would show up
+    response = client.post("/api/budget/transactions/bulk", json=[
+        {"type": "expense", "amount": "1.50", "categoryId": f"Category {offset + i}"}
+        for i in range(count)
+    ])
+    assert response.status_code == 200
+    assert response.get_json()["failed"] == 0
+
+
+def test_transaction_listing_runs_constant_statements(client, record_statements):
+    add_transactions(client, 5)
+    statements = record_statements()
+    small = client.get("/api/budget/transactions?limit=500")
+    small_count = len(statements)
+
+    add_transactions(client, 50, offset=5)
+    statements = record_statements()
+    large = client.get("/api/budget/transactions?limit=500")
+    large_count = len(statements)
+
+    assert small.status_code == large.status_code == 200
+    assert len(large.get_json()["transactions"]) >= len(small.get_json()["transactions"]) + 50
+    assert small_count == large_count
+
+
+def test_repeat_transaction_resolves_category_from_cache(client, record_statements):
+    body = {"type": "expense", "amount": "2.00", "categoryId": "Groceries"}
+    assert client.post("/api/budget/transaction", json=body).status_code == 201
+
+    statements = record_statements()
+    assert client.post("/api/budget/transaction", json=body).status_code == 201
+    assert not [sql for sql in statements if "FROM categories" in sql]
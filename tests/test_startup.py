@@ -0,0 +1,33 @@
+"""Cold-start guard: importing the app stays fast and skips the OAuth stack."""
+
+import json
+import os
+import subprocess
+import sys
+
+# Generous for slow CI runners; the sys.modules check below is the precise
+# guard against the OAuth stack being imported eagerly again
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "3"))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [name for name in ("google_auth_oauthlib", "requests") if name in sys.modules],
+}))
+"""
+
+
+def test_cold_import_is_fast_and_lazy():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=root, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert probe["loaded"] == []
+    assert probe["seconds"] < IMPORT_BUDGET_SECONDS